@@ -9,12 +9,12 @@ from pathlib import Path
 
 # Ensure Vercel can import your backend module
 # From api/index.py, go up to project root, then to apps/agent/src
-ROOT = Path(__file__).resolve().parent.parent
-agent_src = ROOT / "apps" / "agent" / "src"
-sys.path.insert(0, str(agent_src))
+# Resolved once per container; warm invocations reuse the imported module.
+AGENT_SRC = str(Path(__file__).resolve().parent.parent / "apps" / "agent" / "src")
+if AGENT_SRC not in sys.path:
+    sys.path.insert(0, AGENT_SRC)
 
 from pmm_agent.server import app  # exports FastAPI app
 
 # Vercel will automatically handle the adaptation
 # No need for Mangum or custom handler
-
@@ -4,17 +4,12 @@ PMM Deep Agent Factory.
 Creates configurable PMM agents with different capability modes.
 """
 
+import os
+from functools import lru_cache
 from typing import Literal
 
-from langchain_anthropic import ChatAnthropic
-from langgraph.prebuilt import create_react_agent
-
-from .prompts import (
-    MAIN_SYSTEM_PROMPT,
-    COMPETITIVE_ANALYST_PROMPT,
-    MESSAGING_SPECIALIST_PROMPT,
-    LAUNCH_COORDINATOR_PROMPT,
-)
+# LangChain/LangGraph are imported inside each factory so that importing this
+# module (e.g. for health checks on a cold serverless container) stays cheap.
 from .tools import (
     INTAKE_TOOLS,
     RESEARCH_TOOLS,
@@ -27,7 +22,47 @@ from .tools import (
 
 AgentMode = Literal["full", "intake", "research", "planning", "risk"]
 
+# Tools available in each mode (immutable, shared across agent builds)
+_TOOLS_BY_MODE = {
+    "full": tuple(ALL_TOOLS),
+    "intake": tuple(INTAKE_TOOLS),
+    "research": tuple(RESEARCH_TOOLS) + tuple(INTAKE_TOOLS),  # Research needs intake context
+    "planning": tuple(PLANNING_TOOLS) + tuple(INTAKE_TOOLS),
+    "risk": tuple(RISK_TOOLS) + tuple(RESEARCH_TOOLS),
+}
+
+# Resolved once per process; env vars don't change during a container's lifetime
+_DEFAULT_MODEL = os.getenv("MODEL", "claude-sonnet-4-20250514")
+
+
+@lru_cache(maxsize=8)
+def _get_llm(model_name: str, system: str, max_tokens: int):
+    """Get a shared ChatAnthropic client so warm invocations reuse its HTTP pool."""
+    from langchain_anthropic import ChatAnthropic
+
+    return ChatAnthropic(
+        model_name=model_name,
+        max_tokens=max_tokens,
+        system=system,
+    )
+
 
+def get_llm(system: str, max_tokens: int = 8192, model_name: str | None = None):
+    """
+    Get the shared ChatAnthropic client for a system prompt.
+
+    Args:
+        system: System prompt the client sends with every call
+        max_tokens: Response token limit (the main agent uses 8192)
+        model_name: Model to use, defaults to the MODEL env var
+
+    Returns:
+        The cached client, shared with agents built on the same settings
+    """
+    return _get_llm(model_name or _DEFAULT_MODEL, system, max_tokens)
+
+
+@lru_cache(maxsize=8)
 def create_pmm_agent(
     mode: AgentMode = "full",
     model_name: str = "claude-sonnet-4-20250514",
@@ -36,6 +71,9 @@ def create_pmm_agent(
     """
     Create a PMM agent with the specified capabilities.
 
+    Agents are cached per (mode, model_name, with_subagents), so repeated
+    calls return the same compiled graph.
+
     Args:
         mode: Operating mode determining available tools
             - "full": All tools available
@@ -48,26 +86,19 @@ def create_pmm_agent(
 
     Returns:
         Configured LangGraph agent
+
+    Raises:
+        KeyError: If mode is not a known AgentMode
     """
+    from langgraph.prebuilt import create_react_agent
+
+    from .prompts import MAIN_SYSTEM_PROMPT
+
     # Select tools based on mode
-    tools = []
-    if mode == "full":
-        tools = ALL_TOOLS
-    elif mode == "intake":
-        tools = INTAKE_TOOLS
-    elif mode == "research":
-        tools = RESEARCH_TOOLS + INTAKE_TOOLS  # Research needs intake context
-    elif mode == "planning":
-        tools = PLANNING_TOOLS + INTAKE_TOOLS
-    elif mode == "risk":
-        tools = RISK_TOOLS + RESEARCH_TOOLS
+    tools = _TOOLS_BY_MODE[mode]
 
     # Initialize model with system prompt
-    llm = ChatAnthropic(
-        model_name=model_name,
-        max_tokens=8192,
-        system=MAIN_SYSTEM_PROMPT,
-    )
+    llm = _get_llm(model_name, MAIN_SYSTEM_PROMPT, 8192)
 
     # Create base agent
     agent = create_react_agent(
@@ -80,14 +111,11 @@ def create_pmm_agent(
 
 def create_competitive_analyst(model_name: str = None):
     """Create a specialist agent for competitive intelligence."""
-    import os
-    if model_name is None:
-        model_name = os.getenv("MODEL", "claude-sonnet-4-20250514")
-    llm = ChatAnthropic(
-        model_name=model_name,
-        max_tokens=4096,
-        system=COMPETITIVE_ANALYST_PROMPT,
-    )
+    from langgraph.prebuilt import create_react_agent
+
+    from .prompts import COMPETITIVE_ANALYST_PROMPT
+
+    llm = _get_llm(model_name or _DEFAULT_MODEL, COMPETITIVE_ANALYST_PROMPT, 4096)
     return create_react_agent(
         model=llm,
         tools=RESEARCH_TOOLS,
@@ -96,14 +124,11 @@ def create_competitive_analyst(model_name: str = None):
 
 def create_messaging_specialist(model_name: str = None):
     """Create a specialist agent for messaging work."""
-    import os
-    if model_name is None:
-        model_name = os.getenv("MODEL", "claude-sonnet-4-20250514")
-    llm = ChatAnthropic(
-        model_name=model_name,
-        max_tokens=4096,
-        system=MESSAGING_SPECIALIST_PROMPT,
-    )
+    from langgraph.prebuilt import create_react_agent
+
+    from .prompts import MESSAGING_SPECIALIST_PROMPT
+
+    llm = _get_llm(model_name or _DEFAULT_MODEL, MESSAGING_SPECIALIST_PROMPT, 4096)
     return create_react_agent(
         model=llm,
         tools=PLANNING_TOOLS,
@@ -112,14 +137,11 @@ def create_messaging_specialist(model_name: str = None):
 
 def create_launch_coordinator(model_name: str = None):
     """Create a specialist agent for launch planning."""
-    import os
-    if model_name is None:
-        model_name = os.getenv("MODEL", "claude-sonnet-4-20250514")
-    llm = ChatAnthropic(
-        model_name=model_name,
-        max_tokens=4096,
-        system=LAUNCH_COORDINATOR_PROMPT,
-    )
+    from langgraph.prebuilt import create_react_agent
+
+    from .prompts import LAUNCH_COORDINATOR_PROMPT
+
+    llm = _get_llm(model_name or _DEFAULT_MODEL, LAUNCH_COORDINATOR_PROMPT, 4096)
     return create_react_agent(
         model=llm,
         tools=PLANNING_TOOLS + RISK_TOOLS,
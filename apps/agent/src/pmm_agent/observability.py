@@ -4,20 +4,111 @@ Observability and Logging for PMM Agent.
 Tracks agent behavior, tool usage, and response quality for debugging and improvement.
 """
 
+import atexit
+import dataclasses
 import json
 import logging
 import os
+import queue
+import re
+import threading
 import time
-from datetime import datetime
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Any, BinaryIO, Deque, Dict, List, Optional, Set
+from dataclasses import dataclass, field
 from enum import Enum
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+# Optional: compress rotated events files (pip install "preprod-agent[compression]")
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Environment doesn't change during a (serverless) process lifetime, so resolve once
+RUNNING_ON_VERCEL = os.getenv("VERCEL") == "1" or os.getenv("VERCEL_ENV") is not None
+
+# Get log level from environment variable, default to INFO
+_LOG_LEVEL_MAP = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+ROOT_LOG_LEVEL = _LOG_LEVEL_MAP.get(os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+
+# In-memory retention caps so long-lived warm containers don't grow without bound
+EVENT_BUFFER_SIZE = int(os.getenv("PMM_EVENT_BUFFER", "5000"))
+MAX_TRACKED_SESSIONS = int(os.getenv("PMM_MAX_SESSIONS", "1000"))
+
+# A whole line containing "?" (anchored at line start so the scan stays linear)
+_QUESTION_LINE = re.compile(r"^[^\n?]*\?[^\n]*", re.MULTILINE)
+
+# Background event writer: max events per write() and max wait to fill a batch
+EVENT_WRITE_BATCH = 256
+EVENT_WRITE_INTERVAL_S = 0.05
+EXPORT_WRITE_BUFFER = 64 * 1024  # Bytes buffered per write() when exporting metrics
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson fallback: sets become lists, anything else unknown becomes str()."""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _json_fallback_default(obj: Any) -> Any:
+    """Stdlib json fallback: like _json_default, plus dataclasses become (shallow) dicts."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    return _json_default(obj)
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """
+    Serialize to JSON bytes with orjson.
+    
+    Dataclasses (including slotted ones) are encoded natively, so events and
+    session metrics are written without building intermediate dicts. Values
+    orjson rejects but stdlib json accepts (e.g. ints beyond 64 bits in tool
+    args) fall back to json; anything neither can encode still raises.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(obj, default=_json_default, option=option)
+    except TypeError:
+        return json.dumps(
+            obj,
+            default=_json_fallback_default,
+            ensure_ascii=False,
+            indent=2 if pretty else None,
+            separators=None if pretty else (",", ":"),
+        ).encode()
+
+
+# Background listener that owns the real log handlers (see _start_log_listener)
+_log_listener: Optional[QueueListener] = None
+
+
+def _start_log_listener(logger: logging.Logger, handlers: List[logging.Handler]):
+    """Route logger through a QueueHandler and write records from a listener thread."""
+    global _log_listener
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
 
 
 def running_on_vercel() -> bool:
     """Check if running on Vercel serverless environment."""
-    return os.getenv("VERCEL") == "1" or os.getenv("VERCEL_ENV") is not None
+    return RUNNING_ON_VERCEL
 
 
 class LogLevel(Enum):
@@ -28,7 +119,7 @@ class LogLevel(Enum):
     ERROR = "ERROR"
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallEvent:
     """Record of a tool call."""
     tool_name: str
@@ -41,7 +132,7 @@ class ToolCallEvent:
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentResponseEvent:
     """Record of an agent response."""
     session_id: str
@@ -56,7 +147,7 @@ class AgentResponseEvent:
     clarification_question: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionMetrics:
     """Metrics for a conversation session."""
     session_id: str
@@ -64,8 +155,9 @@ class SessionMetrics:
     message_count: int
     tool_call_count: int
     total_response_time_ms: float
-    tools_used: List[str]
-    errors: List[str]
+    tools_used: Set[str] = field(default_factory=set)
+    errors: List[str] = field(default_factory=list)
+    protocol_violations: int = 0
 
 
 class AgentLogger:
@@ -76,68 +168,87 @@ class AgentLogger:
         Initialize logger.
         
         Args:
-            log_dir: Directory to save log files (default: ./logs or /tmp/logs on Vercel)
+            log_dir: Directory to save log files (default: ./logs; unused when file logging is off)
             enable_file_logging: Whether to write logs to files
         """
-        # On Vercel, use /tmp for any file operations (read-write)
-        # Otherwise use project directory
-        if running_on_vercel():
-            self.log_dir = Path("/tmp/logs")
-            # Disable file logging on Vercel by default (use stdout/stderr)
-            self.enable_file_logging = False
-        else:
-            self.log_dir = log_dir or Path(__file__).parent.parent.parent / "logs"
-            self.enable_file_logging = enable_file_logging
+        # Disable file logging on Vercel (use stdout/stderr); export_metrics falls back to /tmp
+        self.enable_file_logging = enable_file_logging and not RUNNING_ON_VERCEL
         
-        # Only create directory if file logging is enabled and not on Vercel
-        if self.enable_file_logging and not running_on_vercel():
-            self.log_dir.mkdir(exist_ok=True)
-        elif running_on_vercel() and self.enable_file_logging:
-            # On Vercel, use /tmp if file logging is explicitly enabled
+        # Only resolve and create the log directory when file logging is enabled
+        self.log_dir: Optional[Path] = None
+        if self.enable_file_logging:
+            self.log_dir = log_dir or Path(__file__).parent.parent.parent / "logs"
             self.log_dir.mkdir(parents=True, exist_ok=True)
         
         # Setup Python logging
         self.logger = logging.getLogger("pmm_agent")
+        self.logger.setLevel(ROOT_LOG_LEVEL)
         
-        # Get log level from environment variable, default to INFO
-        log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
-        log_level_map = {
-            "DEBUG": logging.DEBUG,
-            "INFO": logging.INFO,
-            "WARNING": logging.WARNING,
-            "ERROR": logging.ERROR,
-        }
-        root_log_level = log_level_map.get(log_level_str, logging.INFO)
-        self.logger.setLevel(root_log_level)
-        
-        # Console handler (always use stdout/stderr)
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(root_log_level)
-        console_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
+        # Handlers live on the shared "pmm_agent" logger, so only attach them once per
+        # process; re-created AgentLoggers (tests, module reloads) would otherwise stack them
+        if not self.logger.handlers:
+            # Console handler (always use stdout/stderr)
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(ROOT_LOG_LEVEL)
+            console_formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            console_handler.setFormatter(console_formatter)
+            handlers: List[logging.Handler] = [console_handler]
+            file_error: Optional[Exception] = None
         
-        # File handler (only if enabled and directory is writable)
-        if self.enable_file_logging:
-            try:
-                file_handler = logging.FileHandler(self.log_dir / "agent.log")
-                # File handler uses DEBUG level to capture everything (filtered by logger level)
-                file_handler.setLevel(logging.DEBUG)
-                file_formatter = logging.Formatter(
-                    '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-                )
-                file_handler.setFormatter(file_formatter)
-                self.logger.addHandler(file_handler)
-            except (OSError, PermissionError) as e:
+            # File handler (only if enabled and directory is writable)
+            if self.enable_file_logging:
+                try:
+                    file_handler = logging.FileHandler(self.log_dir / "agent.log")
+                    # File handler uses DEBUG level to capture everything (filtered by logger level)
+                    file_handler.setLevel(logging.DEBUG)
+                    file_formatter = logging.Formatter(
+                        '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+                    )
+                    file_handler.setFormatter(file_formatter)
+                    handlers.append(file_handler)
+                except (OSError, PermissionError) as e:
+                    file_error = e
+                    self.enable_file_logging = False
+            
+            if self.enable_file_logging:
+                # Writes happen on a listener thread; callers (including the async
+                # request path) only enqueue the record
+                _start_log_listener(self.logger, handlers)
+            else:
+                # Console only (e.g. Vercel): write directly so nothing is left
+                # queued when a serverless instance is frozen between requests
+                self.logger.addHandler(console_handler)
+            
+            if file_error is not None:
                 # If we can't write to file, just log to console
-                self.logger.warning(f"Could not create file handler: {e}. Using console logging only.")
-                self.enable_file_logging = False
+                self.logger.warning("Could not create file handler: %s. Using console logging only.", file_error)
         
         # Event storage
-        self.events: List[AgentResponseEvent] = []
-        self.sessions: Dict[str, SessionMetrics] = {}
+        # Ring buffer of recent events and LRU-ordered session metrics (oldest evicted first)
+        self.events: Deque[AgentResponseEvent] = deque(maxlen=EVENT_BUFFER_SIZE)
+        self.sessions: "OrderedDict[str, SessionMetrics]" = OrderedDict()
+        self._eviction_warned = False
+        
+        # Running totals updated in log_response (read by export_metrics)
+        self._all_events_count = 0
+        self._protocol_violations_count = 0
+        self._tool_calls_total = 0
+        
+        # Events are written by a background thread (started lazily) that batches
+        # queued events into one write() on a long-lived, day-rotated file handle
+        # (None stops the writer; a threading.Event is set once everything before it is written)
+        self._event_queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._event_fh: Optional[BinaryIO] = None
+        self._event_fh_date: Optional[str] = None
+        atexit.register(self.close)
+        
+        # Cached YYYYMMDD string for file rotation (see _today)
+        self._today_str: str = ""
+        self._today_expires: float = 0.0
     
     def log_tool_call(
         self,
@@ -149,7 +260,13 @@ class AgentLogger:
         result: Optional[str] = None,
         error: Optional[str] = None,
     ):
-        """Log a tool call event."""
+        """
+        Log a tool call event.
+        
+        Callers measuring duration_ms should use a monotonic clock, e.g.
+        ``start = time.monotonic_ns()`` then ``(time.monotonic_ns() - start) / 1_000_000``;
+        the event timestamp itself stays wall-clock (time.time()).
+        """
         event = ToolCallEvent(
             tool_name=tool_name,
             args=args,
@@ -161,16 +278,43 @@ class AgentLogger:
             error=error,
         )
         
-        self.logger.info(
-            f"[TOOL] {tool_name} | Session: {session_id[:8]}... | "
-            f"Args: {json.dumps(args, default=str)[:100]}"
-        )
+        # Lazy %-style formatting: skip the args serialization when INFO is disabled
+        if self.logger.isEnabledFor(logging.INFO):
+            try:
+                args_repr = _dumps(args)[:100].decode(errors="ignore")
+            except Exception:
+                # A log preview must never abort the caller's turn
+                args_repr = repr(args)[:100]
+            self.logger.info(
+                "[TOOL] %s | Session: %s... | Args: %s",
+                tool_name, session_id[:8], args_repr,
+            )
         
         if error:
-            self.logger.error(f"[TOOL ERROR] {tool_name}: {error}")
+            self.logger.error("[TOOL ERROR] %s: %s", tool_name, error)
         
         return event
     
+    def complete_tool_call(
+        self,
+        event: ToolCallEvent,
+        duration_ms: Optional[float] = None,
+        result: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> ToolCallEvent:
+        """
+        Record the outcome of a tool call already logged with log_tool_call.
+        
+        Updates the event in place rather than logging a second event, so each
+        call produces one record (and one [TOOL] line; errors are still logged).
+        """
+        event.duration_ms = duration_ms
+        event.result = result[:200] if result is not None else None
+        event.error = error
+        if error:
+            self.logger.error("[TOOL ERROR] %s: %s", event.tool_name, error)
+        return event
+    
     def log_response(
         self,
         session_id: str,
@@ -183,17 +327,22 @@ class AgentLogger:
         is_first_message: bool = False,
     ):
         """Log an agent response event."""
-        # Analyze if clarification protocol was followed (only check on first message)
-        followed_protocol, clarification_q = self._analyze_clarification_protocol(
-            user_message, agent_response, tool_calls, is_first_message
-        )
+        now = time.time()  # wall-clock, shared by the event and a new session's start
+        
+        # Analyze if clarification protocol was followed (only applies to the first message)
+        if is_first_message:
+            followed_protocol, clarification_q = self._analyze_clarification_protocol(
+                user_message, agent_response, tool_calls
+            )
+        else:
+            followed_protocol, clarification_q = None, None  # Not applicable to follow-ups
         
         event = AgentResponseEvent(
             session_id=session_id,
             message_id=message_id,
             user_message=user_message,
             agent_response=agent_response,
-            timestamp=time.time(),
+            timestamp=now,
             tool_calls=tool_calls,
             response_time_ms=response_time_ms,
             token_count=token_count,
@@ -201,39 +350,48 @@ class AgentLogger:
             clarification_question=clarification_q,
         )
         
+        if len(self.events) == self.events.maxlen:
+            self._warn_eviction(f"event buffer full ({self.events.maxlen}); oldest events are being dropped")
         self.events.append(event)
+        self._all_events_count += 1
+        self._tool_calls_total += len(tool_calls)
         
         # Update session metrics
         if session_id not in self.sessions:
             self.sessions[session_id] = SessionMetrics(
                 session_id=session_id,
-                start_time=time.time(),
+                start_time=now,
                 message_count=0,
                 tool_call_count=0,
                 total_response_time_ms=0,
-                tools_used=[],
-                errors=[],
             )
+            if len(self.sessions) > MAX_TRACKED_SESSIONS:
+                self.sessions.popitem(last=False)
+                self._warn_eviction(f"session limit reached ({MAX_TRACKED_SESSIONS}); least recently active sessions are being dropped")
+        else:
+            self.sessions.move_to_end(session_id)
         
         session = self.sessions[session_id]
         session.message_count += 1
         session.tool_call_count += len(tool_calls)
         session.total_response_time_ms += response_time_ms
-        session.tools_used.extend([tc.tool_name for tc in tool_calls])
+        session.tools_used.update(tc.tool_name for tc in tool_calls)
+        if followed_protocol is False:
+            session.protocol_violations += 1
+            self._protocol_violations_count += 1
         
         # Log summary
+        short_sid = session_id[:8]
         protocol_status = "✅ FOLLOWED" if followed_protocol else "❌ VIOLATED"
         self.logger.info(
-            f"[RESPONSE] Session: {session_id[:8]}... | "
-            f"Protocol: {protocol_status} | "
-            f"Tools: {len(tool_calls)} | "
-            f"Time: {response_time_ms:.0f}ms"
+            "[RESPONSE] Session: %s... | Protocol: %s | Tools: %d | Time: %.0fms",
+            short_sid, protocol_status, len(tool_calls), response_time_ms,
         )
         
-        if not followed_protocol and len(tool_calls) > 0:
+        if not followed_protocol and tool_calls and self.logger.isEnabledFor(logging.WARNING):
             self.logger.warning(
-                f"[PROTOCOL VIOLATION] Agent called {len(tool_calls)} tools before asking clarifying question. "
-                f"Tools: {[tc.tool_name for tc in tool_calls]}"
+                "[PROTOCOL VIOLATION] Agent called %d tools before asking clarifying question. Tools: %s",
+                len(tool_calls), [tc.tool_name for tc in tool_calls],
             )
         
         # Save to file
@@ -247,128 +405,295 @@ class AgentLogger:
         user_message: str,
         agent_response: str,
         tool_calls: List[ToolCallEvent],
-        is_first_message: bool = False,
     ) -> tuple[Optional[bool], Optional[str]]:
         """
         Analyze if the agent followed the clarification protocol.
         
-        The protocol only applies to the FIRST message in a conversation.
-        After the user answers the clarifying question, the agent should proceed with analysis.
+        The protocol only applies to the FIRST message in a conversation, so
+        log_response only calls this for first messages. After the user answers
+        the clarifying question, the agent should proceed with analysis.
         
         Returns:
             (followed_protocol, clarification_question)
         """
-        # Protocol only applies to first message
-        if not is_first_message:
-            return None, None  # Not applicable to follow-up messages
-        
         # If tools were called immediately on first message, protocol was violated
-        if len(tool_calls) > 0:
-            # Check if response contains a question mark (might have asked AND called tools)
-            has_question = "?" in agent_response
-            if has_question:
-                # Extract question if present
-                lines = agent_response.split("\n")
-                questions = [line for line in lines if "?" in line]
-                clarification_q = questions[0] if questions else None
-                # If it asked a question but also called tools, it's a violation
-                return False, clarification_q
-            return False, None
+        # (even if it also asked a question - it should wait for the answer first)
+        if tool_calls:
+            return False, self._first_question_line(agent_response)
         
         # No tools called - check if it asked a question
-        has_question = "?" in agent_response
-        if has_question:
-            lines = agent_response.split("\n")
-            questions = [line for line in lines if "?" in line and len(line.strip()) > 10]
-            clarification_q = questions[0] if questions else None
-            return True, clarification_q
+        if "?" in agent_response:
+            return True, self._first_question_line(agent_response, min_length=10)
         
         # No question, no tools - might be a follow-up response
         return None, None
     
+    @staticmethod
+    def _first_question_line(text: str, min_length: int = 0) -> Optional[str]:
+        """Return the first line containing '?' whose stripped length exceeds min_length."""
+        for match in _QUESTION_LINE.finditer(text):
+            line = match.group(0)
+            if len(line.strip()) > min_length:
+                return line
+        return None
+    
     def _save_event(self, event: AgentResponseEvent):
         """Save event to JSON file for analysis."""
         if not self.enable_file_logging:
             # On Vercel or when file logging disabled, just log to console
-            self.logger.debug(f"[EVENT] {json.dumps(asdict(event), default=str)}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("[EVENT] %s", _dumps(event).decode())
             return
         
+        # Hand off to the writer thread; serialization and disk I/O stay off the request path
+        if self._writer_thread is None:
+            self._start_event_writer()
+        self._event_queue.put(event)
+    
+    def _start_event_writer(self):
+        """Start the background event writer thread (once)."""
+        with self._writer_lock:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(
+                    target=self._drain_events, name="pmm-event-writer", daemon=True
+                )
+                self._writer_thread.start()
+    
+    def _drain_events(self):
+        """Writer thread loop: batch queued events and append them to the events file."""
+        while True:
+            batch = [self._event_queue.get()]
+            deadline = time.monotonic() + EVENT_WRITE_INTERVAL_S
+            while isinstance(batch[-1], AgentResponseEvent) and len(batch) < EVENT_WRITE_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._event_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            marker = batch[-1]
+            events = batch if isinstance(marker, AgentResponseEvent) else batch[:-1]
+            if events:
+                try:
+                    self._write_events(events)
+                except Exception:
+                    # Never let one bad batch kill the writer; later events still get written
+                    self.logger.exception("Could not save %d events to file", len(events))
+            if isinstance(marker, threading.Event):
+                marker.set()  # flush() waiter
+            elif marker is None:
+                return
+    
+    def _write_events(self, events: List[AgentResponseEvent]):
+        """Append a batch of events to today's JSONL file in a single write."""
         try:
-            event_file = self.log_dir / f"events_{datetime.now().strftime('%Y%m%d')}.jsonl"
-            with open(event_file, "a") as f:
-                f.write(json.dumps(asdict(event), default=str) + "\n")
+            today = self._today()
+            if self._event_fh_date != today:
+                # Rotate to the new day's file, then compress the day we just finished
+                previous = self._event_fh_date
+                self._close_event_file()
+                event_file = self.log_dir / f"events_{today}.jsonl"
+                self._event_fh = open(event_file, "ab", buffering=0)
+                self._event_fh_date = today
+                if previous is not None:
+                    self._compress_event_file(previous)
+            self._event_fh.write(b"".join(self._encode_events(events)))
         except (OSError, PermissionError) as e:
-            self.logger.warning(f"Could not save event to file: {e}")
+            self.logger.warning("Could not save event to file: %s", e)
+    
+    def _encode_events(self, events: List[AgentResponseEvent]):
+        """Yield one JSONL line per event, dropping (and logging) any that can't be encoded."""
+        for event in events:
+            try:
+                yield _dumps(event) + b"\n"
+            except Exception as e:
+                self.logger.warning(
+                    "Dropping unserializable event %s (session %s...): %s",
+                    event.message_id, event.session_id[:8], e,
+                )
+    
+    def _compress_event_file(self, date: str):
+        """
+        zstd-compress the events file this process just rotated away from.
+        
+        Runs on the writer thread. Today's file stays plain JSONL so it can be
+        tailed; the finished day becomes events_YYYYMMDD.jsonl.zst (read with
+        zstdcat). Other workers may rotate the same file, so an existing .zst is
+        left alone, the archive is written to a temp file and renamed into
+        place, and the original is kept if it grew while being compressed.
+        No-op without zstandard.
+        """
+        if zstandard is None:
+            return
+        path = self.log_dir / f"events_{date}.jsonl"
+        target = path.with_name(path.name + ".zst")
+        tmp = path.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            if target.exists():
+                return
+            size = path.stat().st_size
+            with open(path, "rb") as src, open(tmp, "wb") as dst:
+                zstandard.ZstdCompressor(level=3).copy_stream(src, dst)
+            if path.stat().st_size != size:
+                # A late writer appended meanwhile; keep the plain file intact
+                tmp.unlink()
+                return
+            os.replace(tmp, target)
+            path.unlink()
+        except FileNotFoundError:
+            # Another worker compressed it first
+            tmp.unlink(missing_ok=True)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            self.logger.warning("Could not compress %s: %s", path.name, e)
+    
+    def _today(self) -> str:
+        """
+        Current local date as YYYYMMDD, recomputed once the cached day is over.
+        
+        Expiring exactly at local midnight (rather than on a fixed interval) makes
+        every worker rotate on its first write of the new day, so none keeps
+        appending to a file another worker is compressing.
+        """
+        now = time.time()
+        if now >= self._today_expires:
+            local = time.localtime(now)
+            self._today_str = time.strftime('%Y%m%d', local)
+            # mktime normalizes day overflow (e.g. Jan 32 -> Feb 1)
+            self._today_expires = time.mktime(
+                (local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1)
+            )
+        return self._today_str
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Block until every event logged so far has been written.
+        
+        Returns False if the writer didn't catch up within timeout.
+        """
+        if self._writer_thread is None:
+            return True
+        written = threading.Event()
+        self._event_queue.put(written)
+        return written.wait(timeout)
+    
+    def close(self):
+        """
+        Drain pending events and close the events file (also registered with atexit).
+        
+        Safe to call more than once; the writer restarts on the next logged event.
+        """
+        if self._writer_thread is not None:
+            self._event_queue.put(None)
+            self._writer_thread.join(timeout=5)
+            self._writer_thread = None
+        self._close_event_file()
+    
+    def _close_event_file(self):
+        """Close the events file handle (called on rotation and at shutdown)."""
+        if self._event_fh is not None:
+            try:
+                self._event_fh.close()
+            except OSError:
+                pass
+            self._event_fh = None
+            self._event_fh_date = None
+    
+    def _warn_eviction(self, reason: str):
+        """Warn (once per logger) that in-memory observability data is being evicted."""
+        if not self._eviction_warned:
+            self._eviction_warned = True
+            self.logger.warning(
+                "[OBSERVABILITY] %s. Raise PMM_EVENT_BUFFER / PMM_MAX_SESSIONS to retain more.",
+                reason,
+            )
+    
+    def get_totals(self) -> Dict[str, int]:
+        """Get process-wide totals from the running counters (no event scan)."""
+        return {
+            "total_sessions": len(self.sessions),
+            "total_events": self._all_events_count,
+            "total_tool_calls": self._tool_calls_total,
+            "protocol_violations": self._protocol_violations_count,
+        }
     
     def get_session_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get summary metrics for a session."""
-        if session_id not in self.sessions:
+        # Single lookup: the session may be evicted concurrently by log_response
+        session = self.sessions.get(session_id)
+        if session is None:
             return None
         
-        session = self.sessions[session_id]
-        events = [e for e in self.events if e.session_id == session_id]
-        
-        protocol_violations = sum(
-            1 for e in events 
-            if e.followed_clarification_protocol is False
-        )
-        
         return {
             "session_id": session_id,
             "message_count": session.message_count,
             "tool_call_count": session.tool_call_count,
             "total_response_time_ms": session.total_response_time_ms,
             "avg_response_time_ms": session.total_response_time_ms / session.message_count if session.message_count > 0 else 0,
-            "tools_used": list(set(session.tools_used)),
-            "protocol_violations": protocol_violations,
+            "tools_used": list(session.tools_used),
+            "protocol_violations": session.protocol_violations,
             "errors": session.errors,
         }
     
-    def export_metrics(self, output_path: Optional[Path] = None) -> Path:
-        """Export all metrics to JSON file."""
-        if not self.enable_file_logging and not output_path:
-            # On Vercel, use /tmp if no path specified
-            output_path = Path("/tmp") / f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        else:
-            output_path = output_path or self.log_dir / f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        metrics = {
-            "sessions": {
-                sid: asdict(session) 
-                for sid, session in self.sessions.items()
-            },
-            "events": [asdict(event) for event in self.events],
-            "summary": {
-                "total_sessions": len(self.sessions),
-                "total_events": len(self.events),
-                "total_tool_calls": sum(len(e.tool_calls) for e in self.events),
-                "protocol_violations": sum(
-                    1 for e in self.events 
-                    if e.followed_clarification_protocol is False
-                ),
-            }
-        }
+    def export_metrics(self, output_path: Optional[Path] = None, pretty: bool = False) -> Path:
+        """
+        Export all metrics to JSON file.
+        
+        The document is streamed to disk compact by default; pretty=True indents
+        each session and event (roughly doubles the bytes written).
+        """
+        if output_path is None:
+            # On Vercel (file logging disabled), use /tmp
+            export_dir = self.log_dir if self.enable_file_logging else Path("/tmp")
+            output_path = export_dir / f"metrics_{time.strftime('%Y%m%d_%H%M%S')}.json"
         
         try:
-            with open(output_path, "w") as f:
-                json.dump(metrics, f, indent=2, default=str)
-            self.logger.info(f"Metrics exported to {output_path}")
+            with open(output_path, "wb", buffering=EXPORT_WRITE_BUFFER) as f:
+                for chunk in self._iter_metrics_json(pretty):
+                    f.write(chunk)
+            self.logger.info("Metrics exported to %s", output_path)
         except (OSError, PermissionError) as e:
-            self.logger.warning(f"Could not export metrics to file: {e}")
+            self.logger.warning("Could not export metrics to file: %s", e)
             # Fallback: log metrics to console
-            self.logger.info(f"Metrics: {json.dumps(metrics, indent=2, default=str)}")
+            self.logger.info("Metrics: %s", b"".join(self._iter_metrics_json()).decode())
         
         return output_path
+    
+    def _iter_metrics_json(self, pretty: bool = False):
+        """
+        Yield the metrics JSON document in chunks.
+        
+        Streams {"sessions": {...}, "events": [...], "summary": {...}} one
+        session/event at a time so export never materializes the full dict.
+        Sessions and events are snapshotted (references only) first: the sync
+        export route runs in a worker thread while requests keep logging.
+        """
+        sessions = list(self.sessions.items())
+        events = list(self.events)
+        
+        yield b'{"sessions":{'
+        for i, (sid, session) in enumerate(sessions):
+            yield (b"," if i else b"") + _dumps(sid) + b":" + _dumps(session, pretty)
+        yield b'},"events":['
+        for i, event in enumerate(events):
+            yield (b"," if i else b"") + _dumps(event, pretty)
+        yield b'],"summary":' + _dumps(self.get_totals()) + b"}"
 
 
 # Global logger instance
 _logger_instance: Optional[AgentLogger] = None
+_logger_lock = threading.Lock()
 
 
 def get_logger() -> AgentLogger:
     """Get or create the global logger instance."""
     global _logger_instance
     if _logger_instance is None:
-        _logger_instance = AgentLogger()
+        with _logger_lock:
+            # Re-check: another thread may have created it while we waited
+            if _logger_instance is None:
+                _logger_instance = AgentLogger()
     return _logger_instance
 
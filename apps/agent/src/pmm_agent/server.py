@@ -6,12 +6,17 @@ Runs without Docker or LangSmith.
 import os
 import json
 import uuid
+import asyncio
 import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
 # Auto-load .env file if it exists (for local development)
 # This allows you to store environment variables in a .env file
 # without needing to export them manually each time
@@ -33,17 +38,15 @@ except ImportError:
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from langchain_core.runnables import RunnableLambda
+from langchain_core.messages import HumanMessage, AIMessage
 
-from .prompts import MAIN_SYSTEM_PROMPT
 from .tools import ALL_TOOLS
 from .observability import get_logger
 from .agent import create_pmm_agent
@@ -53,17 +56,47 @@ TOOL_MAP = {tool.name: tool for tool in ALL_TOOLS}
 
 # Initialize the ReAct agent - this enforces tool usage
 model_name = os.getenv("MODEL", "claude-sonnet-4-20250514")
-agent = create_pmm_agent(mode="full", model_name=model_name)
+
+
+def get_agent():
+    """Get the shared ReAct agent (built once per process, then cached)."""
+    return create_pmm_agent(mode="full", model_name=model_name)
+
+
+# Check for API key (only raise at runtime, not during import)
+# This allows the function to be deployed even if env var isn't set during build
+def check_api_key():
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        raise ValueError(
+            "ANTHROPIC_API_KEY environment variable is not set. "
+            "Please set it before starting the server:\n"
+            "  export ANTHROPIC_API_KEY=sk-ant-your-key-here"
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run once per process/container: validate config, warm the agent, flush logs on exit."""
+    check_api_key()
+    get_agent()  # Build (and cache) the agent before the first request
+    logger.logger.info("🤖 Agent initialized with model: %s", model_name)
+    yield
+    logger.close()
+
 
 # Configure root_path for Vercel deployment
 # Vercel passes /api/* paths, so FastAPI needs to know it's mounted at /api
-import os
 root_path = "/api" if os.getenv("VERCEL") else ""
-app = FastAPI(title="PMM Deep Agent", version="0.1.0", root_path=root_path)
+app = FastAPI(title="PMM Deep Agent", version="0.1.0", root_path=root_path, lifespan=lifespan)
 
 # CORS configuration - restrict origins in production
+IS_PRODUCTION = bool(
+    os.getenv("VERCEL") or os.getenv("PRODUCTION") == "true" or os.getenv("ENVIRONMENT") == "production"
+)
+
+
 def get_allowed_origins():
-    """Get allowed CORS origins based on environment."""
+    """Get allowed CORS origins based on environment (called once, when the middleware is added)."""
     # Check for explicit configuration
     allowed_origins_env = os.getenv("ALLOWED_ORIGINS")
     if allowed_origins_env:
@@ -71,9 +104,7 @@ def get_allowed_origins():
         return [origin.strip() for origin in allowed_origins_env.split(",") if origin.strip()]
     
     # Production environments should restrict origins
-    is_production = os.getenv("VERCEL") or os.getenv("PRODUCTION") == "true" or os.getenv("ENVIRONMENT") == "production"
-    
-    if is_production:
+    if IS_PRODUCTION:
         # In production, default to empty list (no CORS) unless explicitly configured
         # This ensures security - must set ALLOWED_ORIGINS explicitly
         return []
@@ -81,6 +112,7 @@ def get_allowed_origins():
         # Development: allow all origins
         return ["*"]
 
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=get_allowed_origins(),
@@ -89,58 +121,151 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class StreamAwareGZipMiddleware:
+    """
+    GZipMiddleware that passes /chat/stream through uncompressed.
+
+    Gzip without a flush per frame holds SSE events back, and only newer
+    Starlette releases skip text/event-stream on their own.
+    """
+
+    def __init__(self, app, minimum_size: int = 500):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        # endswith: under Vercel the path carries the /api root_path
+        if scope["type"] == "http" and scope["path"].endswith("/chat/stream"):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+
+# Compress JSON responses (/metrics, /metrics/export) above 1 KB; the SSE stream opts out
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1000)
+
 # Rate limiting configuration
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# Check for API key (only raise at runtime, not during import)
-# This allows the function to be deployed even if env var isn't set during build
-def check_api_key():
-    if not os.getenv("ANTHROPIC_API_KEY"):
-        raise ValueError(
-            "ANTHROPIC_API_KEY environment variable is not set. "
-            "Please set it before starting the server:\n"
-            "  export ANTHROPIC_API_KEY=sk-ant-your-key-here"
-        )
-
-# Check on startup (FastAPI startup event)
-@app.on_event("startup")
-async def startup_check():
-    check_api_key()
-
-# Note: Agent is initialized above using create_pmm_agent which sets up ReAct loop
+# Note: Agent is built via get_agent()/create_pmm_agent which sets up the ReAct loop
 # This replaces the old llm_with_tools approach that didn't enforce tool usage
 
-# Simple in-memory session storage
-sessions: dict = {}
+# Simple in-memory session storage (LRU: least recently used session evicted first)
+sessions: "OrderedDict[str, dict]" = OrderedDict()
 
 # Initialize observability
 logger = get_logger()
 
-# Log which model is being used (for debugging/verification)
-# Note: model_name is already defined above when creating the agent
-logger.logger.info(f"🤖 Agent initialized with model: {model_name}")
-
 # Configuration
+# Local development gets verbose stream tracing on stdout (resolved once at import)
+IS_LOCAL = not os.getenv("VERCEL") and not os.getenv("PRODUCTION")
 MAX_MESSAGE_HISTORY = int(os.getenv("MAX_MESSAGE_HISTORY", "100"))  # Keep last 100 messages per session
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "1000"))  # In-memory sessions kept before LRU eviction
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))  # Seconds of inactivity before a session expires
+# Max characters per streamed text frame. Each text delta is coalesced into as few
+# frames as possible (usually one); tool_call frames are never batched.
+TEXT_CHUNK_SIZE = 16 * 1024
+
+
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+# Text frames are the bulk of the stream: pre-encode everything but the content
+_SSE_TEXT_PREFIX = _SSE_PREFIX + b'{"type":"text","content":'
+_SSE_TEXT_SUFFIX = b"}" + _SSE_SUFFIX
+
 
+def sse_frame(payload: dict) -> bytes:
+    """Encode one SSE data frame with orjson (bytes go straight to the response)."""
+    try:
+        body = orjson.dumps(payload, default=str)
+    except TypeError:
+        # orjson rejects values json accepts (e.g. ints beyond 64 bits in tool args)
+        body = json.dumps(payload, default=str, ensure_ascii=False, separators=(",", ":")).encode()
+    return _SSE_PREFIX + body + _SSE_SUFFIX
 
-def truncate_session_messages(session_messages: list) -> list:
+
+def iter_text_frames(text: str):
+    """Yield coalesced SSE text frames for text, at most TEXT_CHUNK_SIZE characters each."""
+    for i in range(0, len(text), TEXT_CHUNK_SIZE):
+        yield _SSE_TEXT_PREFIX + orjson.dumps(text[i:i + TEXT_CHUNK_SIZE]) + _SSE_TEXT_SUFFIX
+
+
+# Session store counters (reported by /metrics)
+session_stats = {"hits": 0, "misses": 0, "evicted": 0, "expired": 0}
+
+
+def expire_idle_sessions(now: float):
+    """Drop sessions idle for more than SESSION_TTL, oldest activity first."""
+    # LRU order is also last-activity order, so stop at the first live session
+    while sessions:
+        oldest_id, oldest = next(iter(sessions.items()))
+        if now - oldest["last_active"] <= SESSION_TTL:
+            break
+        del sessions[oldest_id]
+        session_stats["expired"] += 1
+
+
+def get_or_create_session(session_id: str) -> dict:
     """
-    Truncate session messages to prevent excessive token usage.
-    Always keeps the system message and the most recent N messages.
+    Get a session, creating it if needed, and mark it most recently used.
+    
+    History is a deque of LangChain messages capped at MAX_MESSAGE_HISTORY, so
+    the oldest turns are dropped as new ones arrive (the system prompt is
+    supplied by the agent). Each turn is converted once, when it is appended,
+    and the deque is handed to the agent as-is on later requests.
+    Sessions idle for more than SESSION_TTL seconds expire; once more than
+    MAX_SESSIONS exist, the least recently used one is evicted.
     """
-    if len(session_messages) <= MAX_MESSAGE_HISTORY + 1:  # +1 for system message
-        return session_messages
+    now = time.monotonic()
+    session = sessions.get(session_id)
+    if session is not None and now - session["last_active"] <= SESSION_TTL:
+        session_stats["hits"] += 1
+        session["last_active"] = now
+        sessions.move_to_end(session_id)
+        return session
     
-    # Keep system message (first) + last MAX_MESSAGE_HISTORY messages
-    system_message = session_messages[0] if session_messages and session_messages[0].get("role") == "system" else None
-    recent_messages = session_messages[-(MAX_MESSAGE_HISTORY):] if system_message else session_messages[-MAX_MESSAGE_HISTORY:]
+    session_stats["misses"] += 1
+    if session is not None:
+        del sessions[session_id]
+        session_stats["expired"] += 1
+    expire_idle_sessions(now)
     
-    if system_message:
-        return [system_message] + recent_messages
-    return recent_messages
+    session = {
+        "messages": deque(maxlen=MAX_MESSAGE_HISTORY),
+        "user_turns": 0,  # Counted separately: history is truncated, the count isn't
+        "last_active": now,
+        # Serializes turns on this session so concurrent requests can't interleave
+        "lock": asyncio.Lock(),
+    }
+    sessions[session_id] = session
+    if len(sessions) > MAX_SESSIONS:
+        sessions.popitem(last=False)
+        session_stats["evicted"] += 1
+    return session
+
+
+def extract_text(message) -> str:
+    """Get the text of a message whose content is a string or a list of content blocks."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            item.get('text', '') for item in content
+            if isinstance(item, dict) and item.get('type') == 'text'
+        )
+    return ""
+
+
+def append_turn(session: dict, role: str, content: str):
+    """Record a user/assistant turn in the session's LangChain history."""
+    if role == "user":
+        session["messages"].append(HumanMessage(content=content))
+        session["user_turns"] += 1
+    else:
+        session["messages"].append(AIMessage(content=content))
 
 
 class ChatRequest(BaseModel):
@@ -179,63 +304,32 @@ async def chat(chat_request: ChatRequest, request: Request) -> ChatResponse:
     session_id = chat_request.session_id or str(uuid.uuid4())
 
     # Get or create session
-    if session_id not in sessions:
-        sessions[session_id] = {
-            "messages": [
-                {"role": "system", "content": MAIN_SYSTEM_PROMPT}
-            ]
-        }
-
-    session = sessions[session_id]
-    session["messages"].append({"role": "user", "content": chat_request.message})
-    
-    # Truncate messages to prevent excessive token usage
-    session["messages"] = truncate_session_messages(session["messages"])
-
-    # Convert to LangChain message format and use the agent
-    langchain_messages = []
-    for m in session["messages"]:
-        if m["role"] == "system":
-            continue  # System prompt handled by agent
-        elif m["role"] == "user":
-            langchain_messages.append(HumanMessage(content=m["content"]))
-        elif m["role"] == "assistant":
-            langchain_messages.append(AIMessage(content=m["content"]))
-    
-    # Use the ReAct agent - it will handle tool calling automatically
-    config = {"configurable": {"thread_id": session_id}}
-    result = await agent.ainvoke({"messages": langchain_messages}, config)
-    
-    # Extract final response from agent result
-    # The agent returns messages list, get the last AI message
-    response_text = ""
-    tool_calls = []
-    
-    if isinstance(result, dict) and "messages" in result:
-        messages_list = result["messages"]
-        for msg in reversed(messages_list):
-            if isinstance(msg, AIMessage):
-                if isinstance(msg.content, str):
-                    response_text = msg.content
-                elif isinstance(msg.content, list):
-                    for item in msg.content:
-                        if isinstance(item, dict) and item.get('type') == 'text':
-                            response_text += item.get('text', '')
-                
-                # Extract tool calls if any
-                if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                    tool_calls = [
-                        {"name": tc.get('name') if isinstance(tc, dict) else getattr(tc, 'name', None),
-                         "args": tc.get('args') or tc.get('input', {}) if isinstance(tc, dict) else getattr(tc, 'args', {})}
-                        for tc in msg.tool_calls
-                    ]
-                    break
-    
-    # Fallback if no response found
-    if not response_text:
-        response_text = "I processed your request. (Response extraction may need adjustment)"
-
-    session["messages"].append({"role": "assistant", "content": response_text})
+    session = get_or_create_session(session_id)
+    async with session["lock"]:
+        # Appending past MAX_MESSAGE_HISTORY truncates the oldest turn
+        append_turn(session, "user", chat_request.message)
+        
+        # Use the ReAct agent - it will handle tool calling automatically
+        config = {"configurable": {"thread_id": session_id}}
+        history = list(session["messages"])
+        result = await get_agent().ainvoke({"messages": history}, config)
+
+        # A ReAct run ends on its final AIMessage; everything after the input
+        # history is this turn's output (tool-calling AIMessages and ToolMessages)
+        new_messages = result["messages"][len(history):]
+        response_text = extract_text(new_messages[-1]) if new_messages else ""
+        tool_calls = [
+            {"name": tc["name"], "args": tc["args"]}
+            for msg in new_messages
+            if isinstance(msg, AIMessage)
+            for tc in msg.tool_calls
+        ]
+
+        # Fallback if no response found
+        if not response_text:
+            response_text = "I processed your request. (Response extraction may need adjustment)"
+
+        append_turn(session, "assistant", response_text)
 
     return ChatResponse(
         session_id=session_id,
@@ -250,311 +344,135 @@ async def chat_stream(chat_request: ChatRequest, request: Request):
     """Streaming chat endpoint."""
     session_id = chat_request.session_id or str(uuid.uuid4())
 
-    if session_id not in sessions:
-        sessions[session_id] = {
-            "messages": [
-                {"role": "system", "content": MAIN_SYSTEM_PROMPT}
-            ]
-        }
-
-    session = sessions[session_id]
-    
-    # Check if this is the first user message (for protocol tracking)
-    user_messages = [m for m in session["messages"] if m["role"] == "user"]
-    is_first_message = len(user_messages) == 0
-    
-    session["messages"].append({"role": "user", "content": chat_request.message})
-    
-    # Truncate messages to prevent excessive token usage
-    session["messages"] = truncate_session_messages(session["messages"])
+    session = get_or_create_session(session_id)
 
     # Generate unique message ID for tracking
     message_id = str(uuid.uuid4())
-    start_time = time.time()  # Initialize at function start
+    start_ns = time.monotonic_ns()  # Monotonic clock: immune to wall-clock adjustments
     tool_calls_tracked = []
 
-    async def generate() -> AsyncGenerator[str, None]:
-        # Convert session messages to LangChain message format
-        # The agent expects messages in LangChain format (HumanMessage, AIMessage, etc.)
-        langchain_messages = []
-        for m in session["messages"]:
-            if m["role"] == "system":
-                continue  # System prompt is handled by agent
-            elif m["role"] == "user":
-                langchain_messages.append(HumanMessage(content=m["content"]))
-            elif m["role"] == "assistant":
-                langchain_messages.append(AIMessage(content=m["content"]))
-
-        full_response = ""
-        
-        # Track seen tool calls to prevent duplicates
-        # Use (tool_name, args_hash) as key since tool calls might not have IDs
-        seen_tool_calls = set()
+    async def generate() -> AsyncGenerator[bytes, None]:
+        # Held for the whole turn, so a second request on this session waits
+        # for the reply instead of running against a half-written history
+        async with session["lock"]:
+            # Check if this is the first user message (for protocol tracking)
+            is_first_message = session["user_turns"] == 0
+            
+            # Appending past MAX_MESSAGE_HISTORY truncates the oldest turn
+            append_turn(session, "user", chat_request.message)
+
+            # The agent expects LangChain messages; the session keeps them pre-converted
+            langchain_messages = list(session["messages"])
+
+            response_parts = []  # Joined once at the end instead of += per delta
         
-        def get_tool_call_key(tool_name: str, tool_args: dict) -> str:
-            """Generate a unique key for a tool call to detect duplicates."""
-            try:
-                args_str = json.dumps(tool_args, sort_keys=True)
-            except (TypeError, ValueError):
-                args_str = str(tool_args)
-            return f"{tool_name}:{args_str}"
+            # Tool run id -> (logged event, monotonic start) until the tool finishes
+            pending_tool_calls = {}
         
-        # Debug logging
-        is_local = not os.getenv("VERCEL") and not os.getenv("PRODUCTION")
-        if is_local:
-            print(f"\n🚀 [STREAM] Starting agent stream with {len(langchain_messages)} messages")
+            # Debug logging
+            if IS_LOCAL:
+                print(f"\n🚀 [STREAM] Starting agent stream with {len(langchain_messages)} messages")
         
-        try:
-            # Use the ReAct agent's streaming - it handles tool calling internally
-            # LangGraph streams events as {node_name: output} dictionaries
-            async for event in agent.astream(
-                {"messages": langchain_messages},
-                {"configurable": {"thread_id": session_id}},
-            ):
-                if is_local:
-                    print(f"📦 [STREAM] Event received: {list(event.keys())}")
+            try:
+                # Use the ReAct agent's event stream - it handles tool calling internally.
+                # Model output arrives as token deltas and each tool run fires exactly one
+                # start/end pair, so nothing has to be diffed or deduplicated here.
+                async for event in get_agent().astream_events(
+                    {"messages": langchain_messages},
+                    {"configurable": {"thread_id": session_id}},
+                    version="v2",
+                ):
+                    kind = event["event"]
                 
-                # LangGraph agent streams events with node names
-                # Common node names: "agent" (AI thinking/calling), "tools" (tool execution)
-                for node_name, node_output in event.items():
-                    if is_local:
-                        print(f"   Node: {node_name}, Type: {type(node_output).__name__}")
-                    
-                    # "agent" node contains AIMessage with text and/or tool_calls
-                    # Note: LangGraph may return dict format with "messages" key
-                    if node_name == "agent":
-                        # Handle both dict and AIMessage formats
-                        agent_message = None
-                        if isinstance(node_output, dict):
-                            # LangGraph returns {"messages": [AIMessage, ...]}
-                            if "messages" in node_output and node_output["messages"]:
-                                if is_local:
-                                    print(f"   Dict has {len(node_output['messages'])} messages")
-                                # Get the last message (usually the AI response)
-                                for msg in reversed(node_output["messages"]):
-                                    if isinstance(msg, AIMessage):
-                                        agent_message = msg
-                                        break
-                        elif isinstance(node_output, AIMessage):
-                            agent_message = node_output
-                        
-                        if is_local and agent_message is None:
-                            print(f"   ⚠️  No AIMessage found in agent node output")
-                        
-                        if agent_message:
-                            if is_local:
-                                print(f"   Processing AIMessage, content type: {type(agent_message.content).__name__}")
-                            
-                            # Check for tool calls first
-                            if hasattr(agent_message, 'tool_calls') and agent_message.tool_calls:
-                                for tc in agent_message.tool_calls:
-                                    # Handle both dict and object formats
-                                    if isinstance(tc, dict):
-                                        tool_name = tc.get('name')
-                                        tool_args = tc.get('input') or tc.get('args', {})
-                                    else:
-                                        tool_name = getattr(tc, 'name', None)
-                                        tool_args = getattr(tc, 'args', {}) or getattr(tc, 'input', {})
-                                    
-                                    if tool_name:
-                                        # Check if we've already seen this tool call
-                                        tool_call_key = get_tool_call_key(tool_name, tool_args)
-                                        if tool_call_key in seen_tool_calls:
-                                            if is_local:
-                                                print(f"   ⏭️  Skipping duplicate tool call: {tool_name}")
-                                            continue
-                                        
-                                        seen_tool_calls.add(tool_call_key)
-                                        
-                                        # Log tool call
-                                        tool_event = logger.log_tool_call(
-                                            tool_name=tool_name,
-                                            args=tool_args,
-                                            session_id=session_id,
-                                            message_id=message_id,
-                                        )
-                                        tool_calls_tracked.append(tool_event)
-                                        
-                                        # Local logging
-                                        if is_local:
-                                            try:
-                                                args_preview = json.dumps(tool_args)[:200] + "..." if len(json.dumps(tool_args)) > 200 else json.dumps(tool_args)
-                                            except (TypeError, ValueError):
-                                                args_preview = str(tool_args)[:200] + "..." if len(str(tool_args)) > 200 else str(tool_args)
-                                            print(f"\n🔧 [TOOL] Executing: {tool_name}")
-                                            print(f"   Args: {args_preview}")
-                                        
-                                        # Stream tool call to frontend
-                                        yield f"data: {json.dumps({'type': 'tool_call', 'name': tool_name, 'args': tool_args})}\n\n"
-            
-                            # Extract and stream text content
-                            text_content = ""
-                            if isinstance(agent_message.content, str):
-                                text_content = agent_message.content
-                            elif isinstance(agent_message.content, list):
-                                for item in agent_message.content:
-                                    if isinstance(item, dict):
-                                        if item.get('type') == 'text':
-                                            text_content += item.get('text', '')
-                                        elif item.get('type') == 'tool_use':
-                                            # Also handle tool_use in content (Anthropic format)
-                                            # Note: This is the same tool call, just in different format
-                                            tool_name = item.get('name')
-                                            tool_args = item.get('input', {})
-                                            if tool_name:
-                                                # Check if we've already seen this tool call
-                                                tool_call_key = get_tool_call_key(tool_name, tool_args)
-                                                if tool_call_key in seen_tool_calls:
-                                                    if is_local:
-                                                        print(f"   ⏭️  Skipping duplicate tool_use: {tool_name}")
-                                                    continue
-                                                
-                                                seen_tool_calls.add(tool_call_key)
-                                                
-                                                tool_event = logger.log_tool_call(
-                                                    tool_name=tool_name,
-                                                    args=tool_args,
-                                                    session_id=session_id,
-                                                    message_id=message_id,
-                                                )
-                                                tool_calls_tracked.append(tool_event)
-                                                if is_local:
-                                                    print(f"\n🔧 [TOOL] Executing (from content): {tool_name}")
-                                                yield f"data: {json.dumps({'type': 'tool_call', 'name': tool_name, 'args': tool_args})}\n\n"
-                            
-                            # Stream text character by character (only new text)
-                            if text_content:
-                                # Only stream characters we haven't already streamed
-                                new_text = text_content[len(full_response):]
-                                for char in new_text:
-                                    full_response += char
-                                    yield f"data: {json.dumps({'type': 'text', 'content': char})}\n\n"
+                    # Text delta from the model (content is a str or a list of content blocks)
+                    if kind == "on_chat_model_stream":
+                        new_text = extract_text(event["data"]["chunk"])
+                        if new_text:
+                            response_parts.append(new_text)
+                            for frame in iter_text_frames(new_text):
+                                yield frame
+                
+                    # Tool about to run: log it and stream the call to the frontend
+                    elif kind == "on_tool_start":
+                        tool_name = event["name"]
+                        tool_args = event["data"].get("input") or {}
                     
-                    # "tools" node contains ToolMessage list (tool results)
-                    elif node_name == "tools":
-                        if is_local:
-                            print(f"   Tool results received: {len(node_output) if isinstance(node_output, list) else 1}")
-                        # Tool results are handled internally by the agent, we just log
-                        if isinstance(node_output, list):
-                            for tool_msg in node_output:
-                                if hasattr(tool_msg, 'content') and is_local:
-                                    result_preview = str(tool_msg.content)[:150] + "..." if len(str(tool_msg.content)) > 150 else str(tool_msg.content)
-                                    print(f"✅ [TOOL] Result received: {result_preview}")
+                        tool_event = logger.log_tool_call(
+                            tool_name=tool_name,
+                            args=tool_args,
+                            session_id=session_id,
+                            message_id=message_id,
+                        )
+                        tool_calls_tracked.append(tool_event)
+                        pending_tool_calls[event["run_id"]] = (tool_event, time.monotonic_ns())
                     
-                    # Fallback: handle any list of messages or other formats
-                    elif isinstance(node_output, list):
-                        # Process tool calls
-                        for msg in node_output if isinstance(node_output, list) else [node_output]:
-                            if isinstance(msg, AIMessage) and hasattr(msg, 'tool_calls') and msg.tool_calls:
-                                for tc in msg.tool_calls:
-                                    tool_name = tc.get('name') if isinstance(tc, dict) else getattr(tc, 'name', None)
-                                    tool_args = tc.get('input', {}) or tc.get('args', {}) if isinstance(tc, dict) else getattr(tc, 'args', {})
-                                    
-                                    if tool_name:
-                                        # Check if we've already seen this tool call
-                                        tool_call_key = get_tool_call_key(tool_name, tool_args)
-                                        if tool_call_key in seen_tool_calls:
-                                            if is_local:
-                                                print(f"   ⏭️  Skipping duplicate tool call (fallback): {tool_name}")
-                                            continue
-                                        
-                                        seen_tool_calls.add(tool_call_key)
-                                        
-                                        # Log tool call for observability
-                                        tool_event = logger.log_tool_call(
-                                            tool_name=tool_name,
-                                            args=tool_args,
-                                            session_id=session_id,
-                                            message_id=message_id,
-                                        )
-                                        tool_calls_tracked.append(tool_event)
-                                        
-                                        # Log for local development
-                                        if is_local:
-                                            try:
-                                                args_preview = json.dumps(tool_args)[:200] + "..." if len(json.dumps(tool_args)) > 200 else json.dumps(tool_args)
-                                            except (TypeError, ValueError):
-                                                args_preview = str(tool_args)[:200] + "..." if len(str(tool_args)) > 200 else str(tool_args)
-                                            print(f"\n🔧 [TOOL] Executing: {tool_name}")
-                                            print(f"   Args: {args_preview}")
-                                        
-                                        # Stream tool call event to frontend
-                                        yield f"data: {json.dumps({'type': 'tool_call', 'name': tool_name, 'args': tool_args})}\n\n"
-                            
-                            # Extract text content from AI messages
-                            if isinstance(msg, AIMessage):
-                                text_content = ""
-                                if isinstance(msg.content, str):
-                                    text_content = msg.content
-                                elif isinstance(msg.content, list):
-                                    for item in msg.content:
-                                        if isinstance(item, dict) and item.get('type') == 'text':
-                                            text_content += item.get('text', '')
-                                
-                                # Stream text character by character
-                                if text_content:
-                                    for char in text_content:
-                                        full_response += char
-                                        yield f"data: {json.dumps({'type': 'text', 'content': char})}\n\n"
-                                
-                                # Check for tool calls in this message too
-                                if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                                    for tc in msg.tool_calls:
-                                        tool_name = tc.get('name') if isinstance(tc, dict) else getattr(tc, 'name', None)
-                                        tool_args = tc.get('input', {}) or tc.get('args', {}) if isinstance(tc, dict) else getattr(tc, 'args', {})
-                                        
-                                        if tool_name:
-                                            # Check if we've already seen this tool call
-                                            tool_call_key = get_tool_call_key(tool_name, tool_args)
-                                            if tool_call_key in seen_tool_calls:
-                                                if is_local:
-                                                    print(f"   ⏭️  Skipping duplicate tool call (msg.tool_calls): {tool_name}")
-                                                continue
-                                            
-                                            seen_tool_calls.add(tool_call_key)
-                                            
-                                            tool_event = logger.log_tool_call(
-                                                tool_name=tool_name,
-                                                args=tool_args,
-                                                session_id=session_id,
-                                                message_id=message_id,
-                                            )
-                                            tool_calls_tracked.append(tool_event)
-                                            
-                                            if is_local:
-                                                try:
-                                                    args_preview = json.dumps(tool_args)[:200] + "..." if len(json.dumps(tool_args)) > 200 else json.dumps(tool_args)
-                                                except (TypeError, ValueError):
-                                                    args_preview = str(tool_args)[:200] + "..." if len(str(tool_args)) > 200 else str(tool_args)
-                                                print(f"\n🔧 [TOOL] Executing: {tool_name}")
-                                                print(f"   Args: {args_preview}")
-                                            
-                                            yield f"data: {json.dumps({'type': 'tool_call', 'name': tool_name, 'args': tool_args})}\n\n"
+                        # Local logging
+                        if IS_LOCAL:
+                            try:
+                                args_preview = orjson.dumps(tool_args, default=str).decode()
+                            except TypeError:  # orjson.JSONEncodeError, e.g. non-str keys
+                                args_preview = str(tool_args)
+                            if len(args_preview) > 200:
+                                args_preview = args_preview[:200] + "..."
+                            print(f"\n🔧 [TOOL] Executing: {tool_name}")
+                            print(f"   Args: {args_preview}")
                     
-                    # Note: "agent" node is already handled above at line 300
-                    # This legacy code path is removed to prevent duplicate processing
+                        yield sse_frame({'type': 'tool_call', 'name': tool_name, 'args': tool_args})
+                
+                    # Tool finished: record the result on the event logged at start
+                    elif kind == "on_tool_end":
+                        output = event["data"].get("output")
+                        result_text = str(getattr(output, 'content', output))
+                        pending = pending_tool_calls.pop(event["run_id"], None)
+                        if pending:
+                            tool_event, tool_start_ns = pending
+                            failed = getattr(output, 'status', None) == "error"
+                            logger.complete_tool_call(
+                                tool_event,
+                                duration_ms=(time.monotonic_ns() - tool_start_ns) / 1_000_000,
+                                result=None if failed else result_text,
+                                error=result_text if failed else None,
+                            )
+                        if IS_LOCAL:
+                            result_preview = result_text[:150] + "..." if len(result_text) > 150 else result_text
+                            print(f"✅ [TOOL] Result received: {result_preview}")
+                
+                    # Tool raised (e.g. invalid args): LangGraph emits this instead of on_tool_end
+                    elif kind == "on_tool_error":
+                        error_text = str(event["data"].get("error"))
+                        pending = pending_tool_calls.pop(event["run_id"], None)
+                        if pending:
+                            tool_event, tool_start_ns = pending
+                            logger.complete_tool_call(
+                                tool_event,
+                                duration_ms=(time.monotonic_ns() - tool_start_ns) / 1_000_000,
+                                error=error_text,
+                            )
+                        if IS_LOCAL:
+                            print(f"❌ [TOOL] Error: {error_text[:150]}")
                                     
-        except Exception as e:
-            logger.logger.error(f"Error in agent stream: {e}")
-            import traceback
-            traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'text', 'content': f'Error: {str(e)}'})}\n\n"
-
-        # Log the complete response
-        response_time_ms = (time.time() - start_time) * 1000
-        logger.log_response(
-            session_id=session_id,
-            message_id=message_id,
-            user_message=chat_request.message,
-            agent_response=full_response,
-            tool_calls=tool_calls_tracked,
-            response_time_ms=response_time_ms,
-            is_first_message=is_first_message,
-        )
-
-        # Update session with final response
-        session["messages"].append({"role": "assistant", "content": full_response})
-        yield f"data: {json.dumps({'type': 'done', 'session_id': session_id})}\n\n"
+            except Exception as e:
+                logger.logger.error("Error in agent stream: %s", e)
+                import traceback
+                traceback.print_exc()
+                yield sse_frame({'type': 'text', 'content': f'Error: {str(e)}'})
+
+            # Log the complete response
+            full_response = "".join(response_parts)
+            response_time_ms = (time.monotonic_ns() - start_ns) / 1_000_000
+            logger.log_response(
+                session_id=session_id,
+                message_id=message_id,
+                user_message=chat_request.message,
+                agent_response=full_response,
+                tool_calls=tool_calls_tracked,
+                response_time_ms=response_time_ms,
+                is_first_message=is_first_message,
+            )
+
+            # Update session with final response
+            append_turn(session, "assistant", full_response)
+            yield sse_frame({'type': 'done', 'session_id': session_id})
 
     return StreamingResponse(
         generate(),
@@ -562,6 +480,8 @@ async def chat_stream(chat_request: ChatRequest, request: Request):
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            # Stop nginx-style proxies from re-buffering the coalesced frames
+            "X-Accel-Buffering": "no",
         }
     )
 
@@ -569,8 +489,7 @@ async def chat_stream(chat_request: ChatRequest, request: Request):
 @app.delete("/sessions/{session_id}")
 def delete_session(session_id: str):
     """Clear a session."""
-    if session_id in sessions:
-        del sessions[session_id]
+    if sessions.pop(session_id, None) is not None:
         return {"status": "deleted"}
     raise HTTPException(status_code=404, detail="Session not found")
 
@@ -591,19 +510,13 @@ def get_cached_metrics():
         return _metrics_cache
     
     # Generate fresh metrics
+    # Snapshot the ids first: this sync route runs in a worker thread while the
+    # event loop keeps reordering logger.sessions (move_to_end on every response)
+    summaries = ((sid, logger.get_session_summary(sid)) for sid in list(logger.sessions))
     metrics = {
-        "sessions": {
-            sid: logger.get_session_summary(sid)
-            for sid in logger.sessions.keys()
-        },
-        "summary": {
-            "total_sessions": len(logger.sessions),
-            "total_events": len(logger.events),
-            "protocol_violations": sum(
-                1 for e in logger.events 
-                if e.followed_clarification_protocol is False
-            ),
-        },
+        "sessions": {sid: summary for sid, summary in summaries if summary is not None},
+        "summary": logger.get_totals(),
+        "session_store": {"active": len(sessions), **session_stats},
         "cached_at": datetime.now().isoformat()
     }
     
@@ -631,12 +544,21 @@ def get_session_metrics(session_id: str, request: Request):
 
 @app.post("/metrics/export")
 @limiter.limit("10/minute")  # 10 exports per minute
-def export_metrics(request: Request):
-    """Export all metrics to JSON file."""
-    output_path = logger.export_metrics()
+def export_metrics(request: Request, pretty: bool = False):
+    """Export all metrics to JSON file (?pretty=true for indented output)."""
+    output_path = logger.export_metrics(pretty=pretty)
     return {"status": "exported", "path": str(output_path)}
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8123)
+    # uvicorn uses uvloop/httptools automatically when the "speedups" extra is installed.
+    # Sessions live in process memory, so WORKERS > 1 needs session-sticky routing.
+    workers = int(os.getenv("WORKERS", "1"))
+    if workers > 1:
+        # Worker processes re-import the app, which needs the import string
+        uvicorn.run("pmm_agent.server:app", host="0.0.0.0", port=8123, workers=workers)
+    else:
+        # Serve this module's app directly: under `python -m` the import string would
+        # load pmm_agent.server a second time, with its own logger and session store
+        uvicorn.run(app, host="0.0.0.0", port=8123)
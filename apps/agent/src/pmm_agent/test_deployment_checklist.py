@@ -8,9 +8,13 @@ docs/DEPLOYMENT.md are properly implemented and configured.
 import os
 import re
 import json
+import shutil
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 from unittest.mock import patch, MagicMock
 
 # Try to import test dependencies - make them optional
@@ -20,6 +24,12 @@ try:
 except ImportError:
     HAS_PYTEST = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 try:
     from fastapi.testclient import TestClient
     from fastapi import status
@@ -57,13 +67,222 @@ except ImportError as e:
         pass
 
 
+# Hardcoded-secret patterns, compiled once at import (bytes: files are scanned undecoded)
+_API_KEY_RES = (
+    re.compile(rb'sk-ant-[a-zA-Z0-9-]{40,}', re.IGNORECASE),  # Anthropic API key pattern
+    re.compile(rb'ANTHROPIC_API_KEY\s*=\s*["\'][^"\']+["\']', re.IGNORECASE),  # Hardcoded env var
+)
+# The same patterns as POSIX EREs for `git grep -E -i`
+_API_KEY_GIT_PATTERNS = (
+    r'sk-ant-[a-zA-Z0-9-]{40,}',
+    r'ANTHROPIC_API_KEY[[:space:]]*=[[:space:]]*["\'][^"\']+["\']',
+)
+
+
+def _alternation(*words: str, flags: int = 0) -> "re.Pattern[str]":
+    """Compile literal words into one regex, so a single scan finds any of them."""
+    return re.compile("|".join(map(re.escape, words)), flags)
+
+
+# Indicator sets for the server.py checks, each matched in one pass
+_INPUT_VALIDATION_RE = _alternation("BaseModel", "ChatRequest", "Field", "min_length", "max_length")
+_CACHE_RE = _alternation("cache", "Cache", "CACHE", "functools.lru_cache", "@lru_cache", "redis", "Redis")
+_ERROR_TRACKING_RE = _alternation("sentry", "Sentry", "sentry_sdk", "rollbar", "bugsnag")
+_RATE_LIMIT_RE = _alternation("RateLimiter", "rate_limit", "slowapi", "limiter", "@limiter", flags=re.IGNORECASE)
+_TRUNCATION_RE = _alternation(
+    "max_messages", "message_limit", "truncate", "history_limit", "[-", "[:", flags=re.IGNORECASE,
+)
+
+# Route decorators, tolerant of either quote style, inner whitespace and extra arguments
+_HEALTH_ROUTE_RE = re.compile(r"""@app\.get\(\s*["']/health["']""")
+_METRICS_ROUTE_RE = re.compile(r"""@app\.get\(\s*["']/metrics["']""")
+
+# Oversized chat message for the input-validation check (potential DoS payload)
+_LONG_MESSAGE = "x" * 100000
+
+# File types scanned for secrets, and directories never descended into
+_SOURCE_SUFFIXES = (".py", ".ts", ".tsx", ".json")
+_SKIP_DIRS = frozenset({
+    ".venv", "venv", "node_modules", ".git", "__pycache__", "dist", "build", ".next", "coverage",
+})
+# Generated files that can't hold a hand-written key: lockfiles and anything this large
+_SKIP_NAMES = frozenset({"package-lock.json", "yarn.lock", "pnpm-lock.yaml"})
+_MAX_SCAN_BYTES = 512_000
+
+# Threads reading files during the source scan (reads are I/O-bound); set
+# DEPLOY_CHECK_WORKERS=1 to read serially, e.g. on a network filesystem
+_SCAN_WORKERS = int(os.getenv("DEPLOY_CHECK_WORKERS", "0")) or min(32, (os.cpu_count() or 1) * 4)
+
+# Opt-in for repeated local/CI runs: only rescan files modified since the last
+# run and carry earlier findings forward for the rest
+_INCREMENTAL_SCAN = os.getenv("DEPLOY_CHECK_INCREMENTAL", "").lower() in ("1", "true")
+
+
+def _iter_source_files(root: Path) -> Iterator[os.DirEntry]:
+    """
+    Walk root once, yielding source files and pruning dependency/VCS directories.
+    
+    Uses os.scandir so directory checks reuse the entry's cached type instead of
+    a stat() per path.
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(_SOURCE_SUFFIXES):
+                        yield entry
+        except OSError:
+            continue
+
+
+def _excluded_from_scan(rel_path: str, name: str) -> bool:
+    """Test files and generated lockfiles are never scanned for keys."""
+    return "test" in rel_path or name in _SKIP_NAMES
+
+
+def _git_grep_api_keys(root: Path) -> Optional[List[str]]:
+    """
+    Repo-relative paths of source files matching an API-key pattern, via `git grep`.
+    
+    Covers tracked files plus untracked files that aren't ignored, applying the
+    same suffixes, pruned directories and exclusions as the Python scan.
+    Returns None when root isn't a git checkout or git fails, so callers fall back.
+    """
+    if shutil.which("git") is None or not (root / ".git").exists():
+        return None
+    cmd = ["git", "grep", "--untracked", "-I", "-l", "-z", "-i", "-E"]
+    for pattern in _API_KEY_GIT_PATTERNS:
+        cmd += ["-e", pattern]
+    cmd.append("--")
+    cmd += [f"*{suffix}" for suffix in _SOURCE_SUFFIXES]
+    cmd += [f":(glob,exclude)**/{name}/**" for name in sorted(_SKIP_DIRS)]
+    try:
+        proc = subprocess.run(cmd, cwd=root, capture_output=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if proc.returncode not in (0, 1):  # 1 just means no matches
+        return None
+    
+    matches = []
+    for rel_path in os.fsdecode(proc.stdout).split("\0"):
+        if not rel_path or _excluded_from_scan(rel_path, os.path.basename(rel_path)):
+            continue
+        try:
+            if os.stat(root / rel_path).st_size > _MAX_SCAN_BYTES:
+                continue
+        except OSError:
+            continue
+        matches.append(rel_path)
+    return matches
+
+
+def _read_source(path: str) -> Optional[bytes]:
+    """Read a file's bytes, or None if it can't be read."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
 class DeploymentChecklistTester:
     """Test harness for deployment checklist verification."""
     
     def __init__(self):
         self.results: Dict[str, Dict[str, Any]] = {}
+        self._all_results: Optional[Dict[str, Any]] = None
         self.project_root = Path(__file__).parent.parent.parent.parent.parent
         self.gitignore_path = self.project_root / ".gitignore"
+        self.scan_state_path = self.project_root / "apps" / "agent" / "logs" / ".checklist_scan_state.json"
+    
+    @staticmethod
+    def _read_module_source(name: str) -> str:
+        """Source of a sibling module, or "" if it doesn't exist."""
+        path = Path(__file__).parent / name
+        return path.read_text() if path.exists() else ""
+    
+    @cached_property
+    def server_src(self) -> str:
+        """server.py source, read once and shared by every check."""
+        return self._read_module_source("server.py")
+    
+    @cached_property
+    def client(self) -> "TestClient":
+        """One TestClient shared by the runtime checks (only used when the server imports)."""
+        return TestClient(app)
+    
+    @cached_property
+    def observability_src(self) -> str:
+        """observability.py source, read once and shared by every check."""
+        return self._read_module_source("observability.py")
+    
+    def _scan_sources(
+        self,
+        scanners: List[Callable[[bytes, str], None]],
+        modified_after: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Read every non-test source file once and hand its bytes to each scanner.
+        
+        Scanners are called as scanner(data, rel_path) and record their own findings.
+        With modified_after (an epoch timestamp), files not modified since then are
+        not read; their relative paths are returned so callers can reuse earlier results.
+        """
+        root_prefix_len = len(str(self.project_root)) + 1
+        paths, rel_paths, unchanged = [], [], []
+        for entry in _iter_source_files(self.project_root):
+            # Skip test files (dependency and build directories are pruned by the walk).
+            # Only the repo-relative part is checked, so a checkout under e.g.
+            # ~/tests/ doesn't skip every file.
+            rel_path = entry.path[root_prefix_len:]
+            if _excluded_from_scan(rel_path, entry.name):
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.st_size > _MAX_SCAN_BYTES:
+                continue
+            if modified_after is not None and stat.st_mtime <= modified_after:
+                unchanged.append(rel_path)
+                continue
+            paths.append(entry.path)
+            rel_paths.append(rel_path)
+        
+        def scan(contents: Iterable[Optional[bytes]]) -> None:
+            # Matching stays on this thread; only the reads overlap
+            for rel_path, data in zip(rel_paths, contents):
+                # Same heuristic as git: a NUL near the start means binary, not source
+                if data is None or data.find(b"\0", 0, 8000) != -1:
+                    continue
+                for scanner in scanners:
+                    scanner(data, rel_path)
+        
+        if _SCAN_WORKERS > 1 and len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(_SCAN_WORKERS, len(paths))) as executor:
+                scan(executor.map(_read_source, paths))
+        else:
+            scan(map(_read_source, paths))
+        return unchanged
+    
+    def _load_scan_state(self) -> Optional[Dict[str, Any]]:
+        """Previous incremental scan state, or None to force a full scan."""
+        try:
+            state = json.loads(self.scan_state_path.read_text())
+            return state if isinstance(state.get("last_run"), (int, float)) else None
+        except (OSError, ValueError, AttributeError):
+            return None
+    
+    def _save_scan_state(self, last_run: float, hardcoded_keys: List[str]) -> None:
+        try:
+            self.scan_state_path.parent.mkdir(parents=True, exist_ok=True)
+            self.scan_state_path.write_text(json.dumps({"last_run": last_run, "hardcoded_keys": hardcoded_keys}))
+        except OSError:
+            pass
     
     def test_api_key_security(self) -> Dict[str, Any]:
         """
@@ -91,38 +310,31 @@ class DeploymentChecklistTester:
                 else:
                     result["issues"].append(".gitignore does not explicitly exclude .env files")
             
-            # Check for hardcoded API keys in source files
-            api_key_patterns = [
-                r'sk-ant-[a-zA-Z0-9-]{40,}',  # Anthropic API key pattern
-                r'ANTHROPIC_API_KEY\s*=\s*["\'][^"\']+["\']',  # Hardcoded env var
-            ]
-            
-            source_files = list(self.project_root.rglob("*.py"))
-            source_files.extend(list(self.project_root.rglob("*.ts")))
-            source_files.extend(list(self.project_root.rglob("*.tsx")))
-            source_files.extend(list(self.project_root.rglob("*.json")))
-            
-            hardcoded_keys = []
-            for pattern in api_key_patterns:
-                for file_path in source_files:
-                    # Skip test files and virtual environments
-                    if "test" in str(file_path) or ".venv" in str(file_path) or "node_modules" in str(file_path):
-                        continue
-                    
-                    try:
-                        content = file_path.read_text()
-                        matches = re.findall(pattern, content, re.IGNORECASE)
-                        if matches:
-                            hardcoded_keys.append({
-                                "file": str(file_path.relative_to(self.project_root)),
-                                "matches": len(matches),
-                            })
-                    except Exception:
-                        continue
+            # Check for hardcoded API keys in source files. In a git checkout, git grep
+            # does the scan natively (skipping ignored files such as .env and
+            # node_modules); otherwise, or in incremental mode, files are scanned here.
+            hardcoded_keys = None if _INCREMENTAL_SCAN else _git_grep_api_keys(self.project_root)
+            if hardcoded_keys is None:
+                hardcoded_keys = []
+                
+                def scan_for_keys(data: bytes, rel_path: str) -> None:
+                    # Presence is all that's reported, so stop at the first hit
+                    if any(cre.search(data) for cre in _API_KEY_RES):
+                        hardcoded_keys.append(rel_path)
+                
+                state = self._load_scan_state() if _INCREMENTAL_SCAN else None
+                scan_started = time.time()  # Files touched during the scan are rescanned next run
+                unchanged = self._scan_sources([scan_for_keys], modified_after=state and state["last_run"])
+                if state:
+                    unchanged = set(unchanged)
+                    hardcoded_keys.extend(f for f in state.get("hardcoded_keys", []) if f in unchanged)
+                    result["details"].append(f"💡 Incremental scan: {len(unchanged)} unchanged file(s) reused from the last run")
+                if _INCREMENTAL_SCAN:
+                    self._save_scan_state(scan_started, hardcoded_keys)
             
             if hardcoded_keys:
                 result["issues"].append(f"Found potential hardcoded API keys in {len(hardcoded_keys)} file(s)")
-                result["details"].append(f"⚠️  Files with potential keys: {[f['file'] for f in hardcoded_keys]}")
+                result["details"].append(f"⚠️  Files with potential keys: {hardcoded_keys}")
             else:
                 result["details"].append("✅ No hardcoded API keys found in source files")
             
@@ -167,9 +379,8 @@ class DeploymentChecklistTester:
         
         try:
             # Check server.py for CORS configuration
-            server_path = Path(__file__).parent / "server.py"
-            if server_path.exists():
-                server_content = server_path.read_text()
+            server_content = self.server_src
+            if server_content:
                 
                 # Check if CORS middleware is added
                 if "CORSMiddleware" in server_content:
@@ -214,20 +425,11 @@ class DeploymentChecklistTester:
         }
         
         try:
-            server_path = Path(__file__).parent / "server.py"
-            if server_path.exists():
-                server_content = server_path.read_text()
-                
-                # Check for rate limiting implementation
-                rate_limit_indicators = [
-                    "RateLimiter",
-                    "rate_limit",
-                    "slowapi",
-                    "limiter",
-                    "@limiter",
-                ]
+            server_content = self.server_src
+            if server_content:
                 
-                has_rate_limiting = any(indicator.lower() in server_content.lower() for indicator in rate_limit_indicators)
+                # Check for rate limiting implementation (case-insensitive)
+                has_rate_limiting = _RATE_LIMIT_RE.search(server_content) is not None
                 
                 if has_rate_limiting:
                     result["details"].append("✅ Rate limiting appears to be implemented")
@@ -260,16 +462,17 @@ class DeploymentChecklistTester:
         }
         
         try:
-            server_path = Path(__file__).parent / "server.py"
-            if server_path.exists():
-                server_content = server_path.read_text()
+            server_content = self.server_src
+            if server_content:
+                # One pass collects every validation token present
+                found = set(_INPUT_VALIDATION_RE.findall(server_content))
                 
                 # Check for Pydantic models
-                if "BaseModel" in server_content and "ChatRequest" in server_content:
+                if "BaseModel" in found and "ChatRequest" in found:
                     result["details"].append("✅ Pydantic models used for request validation (ChatRequest)")
                     
                     # Check for Field validation
-                    if "Field" in server_content and "min_length" in server_content or "max_length" in server_content:
+                    if "Field" in found and "min_length" in found or "max_length" in found:
                         result["details"].append("✅ Message length validation configured (min_length/max_length)")
                     else:
                         result["details"].append("💡 Consider adding explicit message length limits via Field()")
@@ -278,7 +481,7 @@ class DeploymentChecklistTester:
                 
                 # Test with TestClient to verify validation works (if server is available)
                 if HAS_SERVER and HAS_FASTAPI and app is not None:
-                    client = TestClient(app)
+                    client = self.client
                     
                     # Test empty message
                     response = client.post("/chat", json={"message": ""})
@@ -293,8 +496,7 @@ class DeploymentChecklistTester:
                         result["details"].append("✅ Missing required fields are rejected")
                     
                     # Test very long message (potential DoS)
-                    long_message = "x" * 100000
-                    response = client.post("/chat", json={"message": long_message})
+                    response = client.post("/chat", json={"message": _LONG_MESSAGE})
                     # Should either accept (with limits) or reject
                     if response.status_code == 413 or response.status_code == 422:
                         result["details"].append("✅ Very long messages are handled (rejected or limited)")
@@ -362,21 +564,10 @@ class DeploymentChecklistTester:
         }
         
         try:
-            server_path = Path(__file__).parent / "server.py"
-            if server_path.exists():
-                server_content = server_path.read_text()
+            server_content = self.server_src
+            if server_content:
                 
-                cache_indicators = [
-                    "cache",
-                    "Cache",
-                    "CACHE",
-                    "functools.lru_cache",
-                    "@lru_cache",
-                    "redis",
-                    "Redis",
-                ]
-                
-                has_caching = any(indicator in server_content for indicator in cache_indicators)
+                has_caching = _CACHE_RE.search(server_content) is not None
                 
                 if has_caching:
                     result["details"].append("✅ Caching mechanism found")
@@ -408,21 +599,11 @@ class DeploymentChecklistTester:
         }
         
         try:
-            server_path = Path(__file__).parent / "server.py"
-            if server_path.exists():
-                server_content = server_path.read_text()
-                
-                # Check for message limiting/truncation
-                truncation_indicators = [
-                    "max_messages",
-                    "message_limit",
-                    "truncate",
-                    "history_limit",
-                    "[-",
-                    "[:",
-                ]
+            server_content = self.server_src
+            if server_content:
                 
-                has_truncation = any(indicator in server_content.lower() for indicator in truncation_indicators)
+                # Check for message limiting/truncation (case-insensitive)
+                has_truncation = _TRUNCATION_RE.search(server_content) is not None
                 
                 if has_truncation:
                     result["details"].append("✅ Conversation truncation/limiting appears to be implemented")
@@ -454,9 +635,8 @@ class DeploymentChecklistTester:
         }
         
         try:
-            server_path = Path(__file__).parent / "server.py"
-            if server_path.exists():
-                server_content = server_path.read_text()
+            server_content = self.server_src
+            if server_content:
                 
                 # Check if MODEL environment variable is used
                 if 'os.getenv("MODEL"' in server_content or 'os.environ.get("MODEL"' in server_content:
@@ -489,17 +669,16 @@ class DeploymentChecklistTester:
         
         try:
             # Check code for health endpoint
-            server_path = Path(__file__).parent / "server.py"
-            if server_path.exists():
-                server_content = server_path.read_text()
-                if "@app.get(\"/health\")" in server_content or '@app.get("/health")' in server_content:
+            server_content = self.server_src
+            if server_content:
+                if _HEALTH_ROUTE_RE.search(server_content):
                     result["details"].append("✅ /health endpoint defined in code")
                 else:
                     result["issues"].append("Health endpoint not found in server.py")
             
             # Test runtime if available
             if HAS_SERVER and HAS_FASTAPI and app is not None:
-                client = TestClient(app)
+                client = self.client
                 response = client.get("/health")
                 
                 if response.status_code == 200:
@@ -539,22 +718,10 @@ class DeploymentChecklistTester:
         
         try:
             # Check for error tracking services
-            server_path = Path(__file__).parent / "server.py"
-            observability_path = Path(__file__).parent / "observability.py"
-            
-            error_tracking_indicators = ["sentry", "Sentry", "sentry_sdk", "rollbar", "bugsnag"]
-            
-            has_error_tracking = False
-            files_to_check = []
-            if server_path.exists():
-                files_to_check.append(server_path.read_text())
-            if observability_path.exists():
-                files_to_check.append(observability_path.read_text())
-            
-            for content in files_to_check:
-                if any(indicator in content for indicator in error_tracking_indicators):
-                    has_error_tracking = True
-                    break
+            has_error_tracking = any(
+                _ERROR_TRACKING_RE.search(content)
+                for content in (self.server_src, self.observability_src)
+            )
             
             if has_error_tracking:
                 result["details"].append("✅ Error tracking service appears to be configured")
@@ -588,17 +755,16 @@ class DeploymentChecklistTester:
         
         try:
             # Check code for metrics endpoint
-            server_path = Path(__file__).parent / "server.py"
-            if server_path.exists():
-                server_content = server_path.read_text()
-                if "@app.get(\"/metrics\")" in server_content or '@app.get("/metrics")' in server_content:
+            server_content = self.server_src
+            if server_content:
+                if _METRICS_ROUTE_RE.search(server_content):
                     result["details"].append("✅ /metrics endpoint defined in code")
                 else:
                     result["issues"].append("Metrics endpoint not found in server.py")
             
             # Test runtime if available
             if HAS_SERVER and HAS_FASTAPI and app is not None:
-                client = TestClient(app)
+                client = self.client
                 response = client.get("/metrics")
                 
                 if response.status_code == 200:
@@ -618,10 +784,10 @@ class DeploymentChecklistTester:
                 result["status"] = "warning"
             
             # Check observability for token tracking
-            observability_path = Path(__file__).parent / "observability.py"
-            if observability_path.exists():
-                observability_content = observability_path.read_text()
-                if "token" in observability_content.lower() or "cost" in observability_content.lower():
+            observability_content = self.observability_src
+            if observability_content:
+                observability_lower = observability_content.lower()
+                if "token" in observability_lower or "cost" in observability_lower:
                     result["details"].append("✅ Observability system may track tokens/costs")
             
         except Exception as e:
@@ -630,8 +796,16 @@ class DeploymentChecklistTester:
         
         return result
     
-    def run_all_tests(self) -> Dict[str, Any]:
-        """Run all deployment checklist tests."""
+    def run_all_tests(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Run all deployment checklist tests.
+        
+        The results are cached on the tester, so export_results after a run (as in
+        __main__) doesn't repeat every check; pass force=True to run again.
+        """
+        if self._all_results is not None and not force:
+            return self._all_results
+        
         test_methods = [
             self.test_api_key_security,
             self.test_cors_configuration,
@@ -661,10 +835,11 @@ class DeploymentChecklistTester:
                     "issues": [f"Test failed: {e}"],
                 })
         
-        return {
+        self._all_results = {
             "summary": self._generate_summary(results),
             "results": results,
         }
+        return self._all_results
     
     def _generate_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate summary statistics."""
@@ -690,43 +865,47 @@ class DeploymentChecklistTester:
         
         all_results = self.run_all_tests()
         
-        with open(output_path, "w") as f:
-            json.dump(all_results, f, indent=2, default=str)
+        # orjson (an agent dependency) indents natively; stdlib json is the fallback
+        if HAS_ORJSON:
+            output_path.write_bytes(orjson.dumps(all_results, option=orjson.OPT_INDENT_2, default=str))
+        else:
+            with open(output_path, "w") as f:
+                json.dump(all_results, f, indent=2, default=str)
         
         return output_path
 
 
 # Pytest test functions for CI/CD integration (only if pytest is available)
 if HAS_PYTEST:
-    @pytest.mark.asyncio
-    async def test_api_key_security():
+    @pytest.fixture(scope="module")
+    def tester():
+        """One tester per module: the checks run once and each test asserts on its result."""
+        checklist_tester = DeploymentChecklistTester()
+        checklist_tester.run_all_tests()
+        return checklist_tester
+
+
+    def test_api_key_security(tester):
         """Test API key security."""
-        tester = DeploymentChecklistTester()
-        result = tester.test_api_key_security()
+        result = tester.results["API Key Security"]
         assert result["status"] in ["pass", "warning"], f"API key security failed: {result['issues']}"
 
 
-    @pytest.mark.asyncio
-    async def test_cors_configuration():
+    def test_cors_configuration(tester):
         """Test CORS configuration."""
-        tester = DeploymentChecklistTester()
-        result = tester.test_cors_configuration()
+        result = tester.results["CORS Configuration"]
         assert result["status"] != "fail", f"CORS configuration has issues: {result['issues']}"
 
 
-    @pytest.mark.asyncio
-    async def test_input_validation():
+    def test_input_validation(tester):
         """Test input validation."""
-        tester = DeploymentChecklistTester()
-        result = tester.test_input_validation()
+        result = tester.results["Input Validation"]
         assert result["status"] != "fail", f"Input validation has issues: {result['issues']}"
 
 
-    @pytest.mark.asyncio
-    async def test_health_checks():
+    def test_health_checks(tester):
         """Test health checks."""
-        tester = DeploymentChecklistTester()
-        result = tester.test_health_checks()
+        result = tester.results["Health Checks"]
         assert result["status"] == "pass", f"Health checks failed: {result['issues']}"
 
 
@@ -5,30 +5,62 @@ Tests the Clarification Protocol behavior to identify issues.
 """
 
 import asyncio
-import json
+import hashlib
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
-from langchain_anthropic import ChatAnthropic
+import orjson
 from langchain_core.messages import HumanMessage
 
+from .agent import get_llm
 from .prompts import MAIN_SYSTEM_PROMPT
 from .tools import ALL_TOOLS
 from .observability import get_logger, AgentLogger
 
+# Upper bound on in-flight LLM streams during a suite run (provider rate limits)
+_MAX_CONCURRENT_TESTS = 8
+
+# Opt-in replay of earlier LLM responses so re-runs during development skip the API.
+# Keyed on system prompt + test message (editing the prompt invalidates entries), with
+# one recorded sample per suite iteration so consistency runs replay distinct responses.
+CACHE_LLM_RESPONSES = os.getenv("PMM_CACHE_LLM") == "1"
+RESPONSE_CACHE_PATH = Path(__file__).parent.parent.parent / "logs" / "exercise2_llm_cache.json"
+
+
+@lru_cache(maxsize=1)
+def _get_llm_with_tools():
+    """Bind ALL_TOOLS once per process; tool schema conversion isn't free."""
+    llm = get_llm(MAIN_SYSTEM_PROMPT)
+    return llm.bind_tools(ALL_TOOLS)
+
 
 class Exercise2Tester:
     """Test harness for Exercise 2."""
     
     def __init__(self):
         self.logger = get_logger()
-        self.llm = ChatAnthropic(
-            model_name="claude-sonnet-4-20250514",
-            max_tokens=8192,
-            system=MAIN_SYSTEM_PROMPT,
-        )
-        self.llm_with_tools = self.llm.bind_tools(ALL_TOOLS)
+        self.llm_with_tools = _get_llm_with_tools()
         self.results: List[Dict[str, Any]] = []
+        self.cache_hits = 0
+        self.cache_lookups = 0
+        self._response_cache = self._load_response_cache() if CACHE_LLM_RESPONSES else {}
+    
+    def _load_response_cache(self) -> Dict[str, List[Optional[Dict[str, Any]]]]:
+        """Load cached response samples from disk (empty if missing or unreadable)."""
+        try:
+            cache = orjson.loads(RESPONSE_CACHE_PATH.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        return {key: samples for key, samples in cache.items() if isinstance(samples, list)}
+    
+    def _save_response_cache(self) -> None:
+        """Persist cached responses for the next run."""
+        RESPONSE_CACHE_PATH.parent.mkdir(exist_ok=True)
+        RESPONSE_CACHE_PATH.write_bytes(
+            orjson.dumps(self._response_cache, option=orjson.OPT_INDENT_2, default=str)
+        )
     
     async def test_clarification_protocol(
         self,
@@ -41,41 +73,57 @@ class Exercise2Tester:
         Returns:
             Test result with analysis
         """
+        result = await self._check_clarification_protocol(test_message, session_id)
+        self.results.append(result)
+        if CACHE_LLM_RESPONSES:
+            self._save_response_cache()
+        return result
+    
+    async def _check_clarification_protocol(
+        self,
+        test_message: str = "Help me position my SaaS product",
+        session_id: str = "test_session",
+        sample: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Run one clarification check without touching ``self.results``.
+        
+        ``sample`` selects which recorded response to replay when PMM_CACHE_LLM=1.
+        """
         self.logger.logger.info(f"[TEST] Testing clarification protocol with: '{test_message}'")
         
-        messages = [HumanMessage(content=test_message)]
-        tool_calls_detected = []
-        response_text = ""
-        start_time = asyncio.get_event_loop().time()
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         
-        # Stream the response and track tool calls
-        async for chunk in self.llm_with_tools.astream(
-            [{"role": "system", "content": MAIN_SYSTEM_PROMPT}] + messages
-        ):
-            # Track text content
-            if hasattr(chunk, 'content') and chunk.content:
-                content = chunk.content
-                if isinstance(content, str):
-                    response_text += content
-                elif isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, dict) and item.get('type') == 'text':
-                            response_text += item.get('text', '')
-            
-            # Track tool calls
-            if hasattr(chunk, 'tool_calls') and chunk.tool_calls:
-                for tc in chunk.tool_calls:
-                    tool_calls_detected.append({
-                        "name": tc.get('name'),
-                        "args": tc.get('args', {}),
-                    })
-                    self.logger.log_tool_call(
-                        tool_name=tc.get('name'),
-                        args=tc.get('args', {}),
-                        session_id=session_id,
-                    )
+        cached = None
+        if CACHE_LLM_RESPONSES:
+            cache_key = hashlib.sha256(f"{MAIN_SYSTEM_PROMPT}\0{test_message}".encode()).hexdigest()
+            samples = self._response_cache.setdefault(cache_key, [])
+            cached = samples[sample] if sample < len(samples) else None
+            self.cache_lookups += 1
         
-        response_time_ms = (asyncio.get_event_loop().time() - start_time) * 1000
+        if cached is not None:
+            self.cache_hits += 1
+            response_text = cached["response_text"]
+            tool_calls_detected = cached["tool_calls"]
+            # Replay the tool-call logging a live stream would have produced
+            for tc in tool_calls_detected:
+                self.logger.log_tool_call(
+                    tool_name=tc["name"],
+                    args=tc["args"],
+                    session_id=session_id,
+                )
+            # A replay says nothing about model latency; keep it out of timing stats
+            response_time_ms = None
+        else:
+            response_text, tool_calls_detected = await self._stream_response(test_message, session_id)
+            response_time_ms = (loop.time() - start_time) * 1000
+            if CACHE_LLM_RESPONSES:
+                samples.extend([None] * (sample + 1 - len(samples)))
+                samples[sample] = {
+                    "response_text": response_text,
+                    "tool_calls": tool_calls_detected,
+                }
         
         # Analyze result
         has_question = "?" in response_text
@@ -85,9 +133,8 @@ class Exercise2Tester:
         # Extract question if present
         clarification_question = None
         if has_question:
-            lines = response_text.split("\n")
-            questions = [line.strip() for line in lines if "?" in line and len(line.strip()) > 10]
-            clarification_question = questions[0] if questions else None
+            stripped = (line.strip() for line in response_text.splitlines() if "?" in line)
+            clarification_question = next((line for line in stripped if len(line) > 10), None)
         
         result = {
             "test_message": test_message,
@@ -99,16 +146,54 @@ class Exercise2Tester:
             "tools_called": [tc["name"] for tc in tool_calls_detected],
             "response_text": response_text,
             "response_time_ms": response_time_ms,
+            "from_cache": cached is not None,
             "issue": self._identify_issue(followed_protocol, has_question, called_tools, tool_calls_detected),
         }
         
-        self.results.append(result)
         self.logger.logger.info(f"[TEST RESULT] Protocol: {'✅ PASSED' if followed_protocol else '❌ FAILED'}")
         if not followed_protocol:
             self.logger.logger.warning(f"[TEST ISSUE] {result['issue']}")
         
         return result
     
+    async def _stream_response(
+        self,
+        test_message: str,
+        session_id: str,
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Stream one model response, returning its text and the tool calls it made."""
+        messages = [HumanMessage(content=test_message)]
+        tool_calls_detected = []
+        response_parts: List[str] = []
+        
+        # Stream the response and track tool calls
+        # (MAIN_SYSTEM_PROMPT is bound on the client as the native system parameter)
+        async for chunk in self.llm_with_tools.astream(messages):
+            # Track text content
+            if hasattr(chunk, 'content') and chunk.content:
+                content = chunk.content
+                if isinstance(content, str):
+                    response_parts.append(content)
+                elif isinstance(content, list):
+                    for item in content:
+                        if isinstance(item, dict) and item.get('type') == 'text':
+                            response_parts.append(item.get('text', ''))
+            
+            # Track tool calls
+            if hasattr(chunk, 'tool_calls') and chunk.tool_calls:
+                for tc in chunk.tool_calls:
+                    tool_calls_detected.append({
+                        "name": tc.get('name'),
+                        "args": tc.get('args', {}),
+                    })
+                    self.logger.log_tool_call(
+                        tool_name=tc.get('name'),
+                        args=tc.get('args', {}),
+                        session_id=session_id,
+                    )
+        
+        return "".join(response_parts), tool_calls_detected
+    
     def _identify_issue(
         self,
         followed_protocol: bool,
@@ -135,10 +220,19 @@ class Exercise2Tester:
         """Run multiple test iterations to check consistency."""
         self.logger.logger.info(f"[TEST SUITE] Running {num_iterations} iterations")
         
-        for i in range(num_iterations):
-            session_id = f"test_session_{i}"
-            await self.test_clarification_protocol(session_id=session_id)
-            await asyncio.sleep(0.5)  # Small delay between tests
+        # Iterations are independent LLM streams, so run them concurrently
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_TESTS)
+        
+        async def run_iteration(i: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._check_clarification_protocol(
+                    session_id=f"test_session_{i}", sample=i
+                )
+        
+        results = await asyncio.gather(*(run_iteration(i) for i in range(num_iterations)))
+        self.results.extend(results)
+        if CACHE_LLM_RESPONSES:
+            self._save_response_cache()
         
         # Analyze results
         passed = sum(1 for r in self.results if r["followed_protocol"])
@@ -159,6 +253,8 @@ class Exercise2Tester:
             "issues": issues,
             "results": self.results,
         }
+        if CACHE_LLM_RESPONSES:
+            summary["cache_hit_ratio"] = self.cache_hits / self.cache_lookups if self.cache_lookups else 0
         
         self.logger.logger.info(
             f"[TEST SUITE COMPLETE] Passed: {passed}/{len(self.results)} "
@@ -172,8 +268,8 @@ class Exercise2Tester:
         output_path = output_path or Path(__file__).parent.parent.parent / "logs" / "exercise2_test_results.json"
         output_path.parent.mkdir(exist_ok=True)
         
-        with open(output_path, "w") as f:
-            json.dump(self.results, f, indent=2, default=str)
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(self.results, option=orjson.OPT_INDENT_2, default=str))
         
         self.logger.logger.info(f"Test results exported to {output_path}")
         return output_path
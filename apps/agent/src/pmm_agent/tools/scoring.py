@@ -17,6 +17,16 @@ class ReadinessScore(BaseModel):
     next_action: str = Field(description="Most important next step")
 
 
+# (check label, next action if missing), in priority order
+_READINESS_CHECKS = (
+    ("Target Customer Definition", "Define your target customer segment first"),
+    ("Competitive Alternative Identified", "Identify what customers use before finding you"),
+    ("Key Differentiator Articulated", "Articulate what you have that alternatives don't"),
+    ("Customer Proof Available", "Collect customer testimonials and use cases"),
+    ("Market Category Defined", "Define your market category"),
+)
+
+
 @tool
 def calculate_positioning_readiness(
     has_target_customer: bool,
@@ -41,37 +51,31 @@ def calculate_positioning_readiness(
     Returns:
         Readiness score with strengths, gaps, and next action
     """
-    checks = {
-        "Target Customer Definition": has_target_customer,
-        "Competitive Alternative Identified": has_competitive_alternative,
-        "Key Differentiator Articulated": has_key_differentiator,
-        "Customer Proof Available": has_customer_proof,
-        "Market Category Defined": has_clear_category,
-    }
-
-    strengths = [k for k, v in checks.items() if v]
-    gaps = [k for k, v in checks.items() if not v]
-    score = len(strengths) * 2  # 0-10 scale
+    flags = (
+        has_target_customer,
+        has_competitive_alternative,
+        has_key_differentiator,
+        has_customer_proof,
+        has_clear_category,
+    )
 
-    # Determine next action based on gaps
-    if not has_target_customer:
-        next_action = "Define your target customer segment first"
-    elif not has_competitive_alternative:
-        next_action = "Identify what customers use before finding you"
-    elif not has_key_differentiator:
-        next_action = "Articulate what you have that alternatives don't"
-    elif not has_customer_proof:
-        next_action = "Collect customer testimonials and use cases"
-    elif not has_clear_category:
-        next_action = "Define your market category"
-    else:
-        next_action = "You're ready to create positioning!"
+    strengths, gaps = [], []
+    next_action = None
+    for (label, action), present in zip(_READINESS_CHECKS, flags):
+        if present:
+            strengths.append(label)
+        else:
+            gaps.append(label)
+            # The first gap in priority order is the next action
+            if next_action is None:
+                next_action = action
+    score = len(strengths) * 2  # 0-10 scale
 
     return ReadinessScore(
         score=score,
         strengths=strengths,
         gaps=gaps,
-        next_action=next_action,
+        next_action=next_action or "You're ready to create positioning!",
     )
 
 
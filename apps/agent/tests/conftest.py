@@ -0,0 +1,18 @@
+"""
+Shared pytest setup for the tests in this directory.
+
+Puts src on sys.path and points the global AgentLogger (created when
+pmm_agent.server is imported) at a scratch directory, so test runs don't
+leave agent.log / events_*.jsonl in apps/agent/logs.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pmm_agent import observability
+
+if observability._logger_instance is None:
+    observability._logger_instance = observability.AgentLogger(log_dir=Path(tempfile.mkdtemp()))
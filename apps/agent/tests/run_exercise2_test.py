@@ -33,6 +33,8 @@ async def main():
     print(f"Passed: {summary['passed']} ✅")
     print(f"Failed: {summary['failed']} ❌")
     print(f"Pass Rate: {summary['pass_rate']*100:.1f}%")
+    if 'cache_hit_ratio' in summary:
+        print(f"LLM Cache Hit Ratio: {summary['cache_hit_ratio']*100:.1f}%")
     
     if summary['issues']:
         print("\nIssues Found:")
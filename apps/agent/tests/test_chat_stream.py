@@ -0,0 +1,99 @@
+"""
+Tests for tool-call tracking in the /chat/stream endpoint.
+
+Tests:
+1. A tool called with invalid args is logged with its error and duration
+2. A tool that raises is logged the same way, and the turn still completes
+
+Usage:
+    python -m pytest tests/test_chat_stream.py
+"""
+
+import asyncio
+from typing import List
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+# conftest.py puts src on sys.path and sends the server's logs to a temp dir
+from pmm_agent import server
+
+
+class ScriptedModel(BaseChatModel):
+    """Chat model that replies with script[n], n being the AI turns so far."""
+
+    script: List[AIMessage]
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        turn = sum(isinstance(m, AIMessage) for m in messages)
+        return ChatResult(generations=[ChatGeneration(message=self.script[turn])])
+
+
+@tool
+def score_idea(score: int) -> str:
+    """Score a product idea from 1 to 10."""
+    return f"Scored {score}/10"
+
+
+@tool
+def fetch_competitors(market: str) -> str:
+    """Look up competitors in a market."""
+    raise RuntimeError("competitor service unavailable")
+
+
+def _stream_tool_call(name: str, args: dict):
+    """Run one /chat/stream turn where the model calls name(args); return the logged event."""
+    model = ScriptedModel(script=[
+        AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": "call-1"}]),
+        AIMessage(content="Who is your target customer?"),
+    ])
+    agent = create_react_agent(model=model, tools=[score_idea, fetch_competitors])
+    original_get_agent, original_enabled = server.get_agent, server.limiter.enabled
+    server.get_agent = lambda: agent
+    server.limiter.enabled = False
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/chat/stream", json={"message": "hi", "session_id": f"stream-{name}"})
+
+    try:
+        response = asyncio.run(run())
+    finally:
+        server.get_agent, server.limiter.enabled = original_get_agent, original_enabled
+
+    assert response.status_code == 200
+    assert '"type":"done"' in response.text
+    event = server.logger.events[-1]
+    assert event.session_id == f"stream-{name}"
+    return event
+
+
+def test_invalid_tool_args_are_logged_as_errors():
+    """Args that fail validation end the tool call with an error, not a dangling start."""
+    event = _stream_tool_call("score_idea", {"score": "not a number"})
+    [call] = event.tool_calls
+    assert call.tool_name == "score_idea"
+    assert call.result is None
+    assert call.error and "score" in call.error
+    assert call.duration_ms is not None
+
+
+def test_raising_tool_is_logged_as_error():
+    """A tool exception is recorded on its call before the stream reports the failure."""
+    event = _stream_tool_call("fetch_competitors", {"market": "CRM"})
+    [call] = event.tool_calls
+    assert call.result is None
+    assert call.error == "competitor service unavailable"
+    assert call.duration_ms is not None
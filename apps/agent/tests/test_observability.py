@@ -0,0 +1,177 @@
+"""
+Tests for AgentLogger's stateful behavior.
+
+Tests:
+1. Background event writer flushes everything on close()
+2. Writer thread survives events orjson can't encode
+3. Tool-call log preview never raises
+4. Day rotation compresses only the file this process rotated away from
+5. Session LRU eviction and the event ring buffer cap
+6. pmm_agent records still propagate to root handlers
+
+Usage:
+    python -m pytest tests/test_observability.py
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pmm_agent import observability
+from pmm_agent.observability import AgentLogger, ToolCallEvent
+
+
+def _new_logger() -> AgentLogger:
+    """AgentLogger writing into a fresh temporary directory."""
+    return AgentLogger(log_dir=Path(tempfile.mkdtemp()))
+
+
+def _read_events(log_dir: Path, date: str) -> list:
+    """Parse the plain JSONL events file for date."""
+    lines = (log_dir / f"events_{date}.jsonl").read_text().splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_close_flushes_pending_events():
+    """Every queued event is on disk once close() returns."""
+    lg = _new_logger()
+    for i in range(300):
+        lg.log_response("flush-session", f"m{i}", "hi", "Who is your customer?", [], 1.0)
+    lg.close()
+
+    events = _read_events(lg.log_dir, lg._today())
+    assert [e["message_id"] for e in events] == [f"m{i}" for i in range(300)]
+    assert lg._writer_thread is None and lg._event_fh is None
+
+    # close() is idempotent and the writer restarts on the next event
+    lg.close()
+    lg.log_response("flush-session", "m300", "hi", "ok", [], 1.0)
+    lg.close()
+    assert len(_read_events(lg.log_dir, lg._today())) == 301
+
+
+def test_writer_survives_unserializable_events():
+    """A bad event is dropped (or encoded via json) without killing the writer thread."""
+    lg = _new_logger()
+    circular = {}
+    circular["self"] = circular
+    big = ToolCallEvent("analyze_product", {"n": 2**70}, time.time(), "bad-session")
+    bad = ToolCallEvent("analyze_product", circular, time.time(), "bad-session")
+
+    lg.log_response("bad-session", "big", "hi", "ok", [big], 1.0)
+    lg.log_response("bad-session", "circular", "hi", "ok", [bad], 1.0)
+    lg.log_response("bad-session", "after", "hi", "ok", [], 1.0)
+    assert lg.flush(), "writer thread didn't drain the queue"
+    assert lg._writer_thread.is_alive(), "writer thread died"
+    lg.close()
+
+    events = _read_events(lg.log_dir, lg._today())
+    assert [e["message_id"] for e in events] == ["big", "after"]
+    assert events[0]["tool_calls"][0]["args"]["n"] == 2**70
+
+
+def test_tool_call_preview_never_raises():
+    """log_tool_call tolerates args neither orjson nor json can encode."""
+    lg = _new_logger()
+    circular = {}
+    circular["self"] = circular
+    assert lg.log_tool_call("t", {"n": 2**70}, "preview-session").args == {"n": 2**70}
+    assert lg.log_tool_call("t", circular, "preview-session").tool_name == "t"
+    lg.close()
+
+
+def test_rotation_compresses_only_own_previous_file():
+    """Rotation compresses the day this process wrote, never unrelated files."""
+    zstandard = pytest.importorskip("zstandard")
+    lg = _new_logger()
+    foreign = lg.log_dir / "events_20000101.jsonl"
+    foreign.write_text('{"keep": true}\n')
+
+    lg.log_response("rotate-session", "day1", "hi", "ok", [], 1.0)
+    lg.flush()  # "day1" must be written before the date changes
+    day1 = lg._today()
+    lg._today = lambda: "20991231"
+    lg.log_response("rotate-session", "day2", "hi", "ok", [], 1.0)
+    lg.close()
+
+    names = sorted(p.name for p in lg.log_dir.iterdir() if p.name.startswith("events_"))
+    assert names == ["events_20000101.jsonl", f"events_{day1}.jsonl.zst", "events_20991231.jsonl"]
+    assert foreign.read_text() == '{"keep": true}\n'
+    with open(lg.log_dir / f"events_{day1}.jsonl.zst", "rb") as f:
+        data = zstandard.ZstdDecompressor().stream_reader(f).read()
+    assert json.loads(data)["message_id"] == "day1"
+    assert _read_events(lg.log_dir, "20991231")[0]["message_id"] == "day2"
+
+
+def test_rotation_keeps_existing_archive():
+    """An archive another worker already wrote is left alone, as is the plain file."""
+    zstandard = pytest.importorskip("zstandard")
+    lg = _new_logger()
+    lg.log_response("rotate-session", "day1", "hi", "ok", [], 1.0)
+    lg.flush()  # "day1" must be written before the date changes
+    day1 = lg._today()
+    archive = lg.log_dir / f"events_{day1}.jsonl.zst"
+    archive.write_bytes(b"other worker")
+    lg._today = lambda: "20991231"
+    lg.log_response("rotate-session", "day2", "hi", "ok", [], 1.0)
+    lg.close()
+
+    assert archive.read_bytes() == b"other worker"
+    assert (lg.log_dir / f"events_{day1}.jsonl").exists()
+    assert not list(lg.log_dir.glob("*.tmp"))
+
+
+def test_today_expires_at_midnight():
+    """The cached date is valid until the next local midnight."""
+    lg = _new_logger()
+    today = lg._today()
+    expires = time.localtime(lg._today_expires)
+    assert today == time.strftime("%Y%m%d")
+    assert (expires.tm_hour, expires.tm_min, expires.tm_sec) == (0, 0, 0)
+    assert 0 < lg._today_expires - time.time() <= 86400 + 3600  # allow a DST shift
+    lg.close()
+
+
+def test_session_eviction_and_event_buffer():
+    """Least recently active sessions are evicted first; the event buffer is a ring."""
+    original_sessions, original_buffer = observability.MAX_TRACKED_SESSIONS, observability.EVENT_BUFFER_SIZE
+    observability.MAX_TRACKED_SESSIONS, observability.EVENT_BUFFER_SIZE = 3, 5
+    try:
+        lg = AgentLogger(enable_file_logging=False)
+        for sid in ("a", "b", "c"):
+            lg.log_response(sid, "m", "hi", "ok", [], 1.0)
+        lg.log_response("a", "m", "hi", "ok", [], 1.0)  # "a" becomes most recent
+        lg.log_response("d", "m", "hi", "ok", [], 1.0)  # evicts "b"
+        assert list(lg.sessions) == ["c", "a", "d"]
+        assert lg.get_session_summary("b") is None
+        assert lg.get_session_summary("a")["message_count"] == 2
+
+        for i in range(4):
+            lg.log_response("d", f"x{i}", "hi", "ok", [], 1.0)
+        assert len(lg.events) == 5
+        assert lg.get_totals()["total_events"] == 9
+    finally:
+        observability.MAX_TRACKED_SESSIONS, observability.EVENT_BUFFER_SIZE = original_sessions, original_buffer
+
+
+def test_records_propagate_to_root():
+    """pmm_agent records reach root handlers (e.g. pytest caplog)."""
+    lg = AgentLogger(enable_file_logging=False)
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logging.getLogger().addHandler(handler)
+    try:
+        lg.logger.warning("propagation check")
+    finally:
+        logging.getLogger().removeHandler(handler)
+    assert any(r.getMessage() == "propagation check" for r in records)
+
@@ -10,54 +10,59 @@ Usage:
     python3 tests/test_rate_limiting.py production https://your-app.vercel.app
 """
 
+import asyncio
 import sys
 import time
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
+from collections import Counter
 from typing import List, Tuple
 
-def make_request(base_url: str, endpoint: str, count: int = 15) -> List[Tuple[int, int]]:
-    """Make multiple requests and return (status_code, request_number) tuples."""
-    results = []
-    url = f"{base_url}/{endpoint.lstrip('/')}"
-    
-    def make_single_request(num: int) -> Tuple[int, int]:
+try:
+    # Optional "speedups" extra; the stdlib loop is fine without it
+    from uvloop import run as run_async
+except ImportError:
+    run_async = asyncio.run
+
+async def _make_requests(url: str, is_chat: bool, count: int) -> List[Tuple[int, int]]:
+    """Fire all requests at once on one client and wait for every response."""
+    async def make_single_request(client: httpx.AsyncClient, num: int) -> Tuple[int, int]:
         try:
-            if endpoint.startswith("/chat") or endpoint.startswith("/api/chat"):
-                response = requests.post(
-                    url,
-                    json={"message": f"test request {num}"},
-                    timeout=10
-                )
+            if is_chat:
+                response = await client.post(url, json={"message": f"test request {num}"})
             else:
-                response = requests.get(url, timeout=10)
+                response = await client.get(url)
             return (response.status_code, num)
         except Exception as e:
             print(f"  Request {num} failed: {e}")
             return (0, num)
     
+    async with httpx.AsyncClient(timeout=10) as client:
+        return await asyncio.gather(*(make_single_request(client, i+1) for i in range(count)))
+
+def make_request(base_url: str, endpoint: str, count: int = 15) -> List[Tuple[int, int]]:
+    """Make multiple requests and return (status_code, request_number) tuples."""
+    url = f"{base_url}/{endpoint.lstrip('/')}"
+    is_chat = endpoint.startswith("/chat") or endpoint.startswith("/api/chat")
+    
     print(f"\nMaking {count} requests to {url}...")
     
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = [executor.submit(make_single_request, i+1) for i in range(count)]
-        for future in as_completed(futures):
-            status, num = future.result()
-            results.append((status, num))
-            if status == 429:
-                print(f"  ✅ Request {num}: Rate limited (429) - Rate limiting is working!")
-            elif status == 200:
-                print(f"  ✓ Request {num}: Success (200)")
-            else:
-                print(f"  ⚠️  Request {num}: Status {status}")
+    results = run_async(_make_requests(url, is_chat, count))
+    for status, num in results:
+        if status == 429:
+            print(f"  ✅ Request {num}: Rate limited (429) - Rate limiting is working!")
+        elif status == 200:
+            print(f"  ✓ Request {num}: Success (200)")
+        else:
+            print(f"  ⚠️  Request {num}: Status {status}")
     
     return results
 
 def analyze_results(results: List[Tuple[int, int]], limit: int):
     """Analyze rate limiting results."""
-    status_codes = [status for status, _ in results]
-    success_count = status_codes.count(200)
-    rate_limited_count = status_codes.count(429)
-    other_count = len(status_codes) - success_count - rate_limited_count
+    counts = Counter(status for status, _ in results)
+    success_count = counts[200]
+    rate_limited_count = counts[429]
+    other_count = len(results) - success_count - rate_limited_count
     
     print(f"\n{'='*60}")
     print(f"Rate Limiting Test Results")
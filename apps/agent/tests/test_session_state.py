@@ -0,0 +1,128 @@
+"""
+Tests for the server's in-memory session store.
+
+Tests:
+1. Idle sessions expire after SESSION_TTL
+2. Least recently used session is evicted past MAX_SESSIONS
+3. History is capped at MAX_MESSAGE_HISTORY (user turn count is not)
+4. Concurrent /chat calls on one session are serialized by its lock,
+   while different sessions still run concurrently
+
+Usage:
+    python -m pytest tests/test_session_state.py
+"""
+
+import asyncio
+
+import httpx
+from langchain_core.messages import AIMessage
+
+# conftest.py puts src on sys.path and sends the server's logs to a temp dir
+from pmm_agent import server
+
+
+class SlowAgent:
+    """Stand-in for the ReAct agent that records how many turns overlap per session."""
+
+    def __init__(self):
+        self.active = {}
+        self.max_active = {}
+        self.max_total = 0
+
+    async def ainvoke(self, inputs, config):
+        sid = config["configurable"]["thread_id"]
+        self.active[sid] = self.active.get(sid, 0) + 1
+        self.max_active[sid] = max(self.max_active.get(sid, 0), self.active[sid])
+        self.max_total = max(self.max_total, sum(self.active.values()))
+        await asyncio.sleep(0.05)
+        self.active[sid] -= 1
+        reply = AIMessage(content=f"Reply {len(inputs['messages'])}: who is your customer?")
+        return {"messages": list(inputs["messages"]) + [reply]}
+
+
+def _reset_sessions():
+    server.sessions.clear()
+    for key in server.session_stats:
+        server.session_stats[key] = 0
+
+
+def test_idle_sessions_expire():
+    """A session idle past SESSION_TTL is replaced, and idle ones are swept on the next miss."""
+    _reset_sessions()
+    first = server.get_or_create_session("ttl-a")
+    server.get_or_create_session("ttl-b")
+    first["last_active"] -= server.SESSION_TTL + 1
+
+    assert server.get_or_create_session("ttl-a") is not first
+    assert server.session_stats["expired"] == 1
+
+    server.sessions["ttl-b"]["last_active"] -= server.SESSION_TTL + 1
+    server.get_or_create_session("ttl-c")
+    assert list(server.sessions) == ["ttl-a", "ttl-c"]
+    assert server.session_stats["expired"] == 2
+
+
+def test_lru_eviction():
+    """Past MAX_SESSIONS, the least recently used session is evicted."""
+    _reset_sessions()
+    original = server.MAX_SESSIONS
+    server.MAX_SESSIONS = 3
+    try:
+        for sid in ("a", "b", "c"):
+            server.get_or_create_session(sid)
+        server.get_or_create_session("a")  # "a" becomes most recent
+        server.get_or_create_session("d")  # evicts "b"
+        assert list(server.sessions) == ["c", "a", "d"]
+        assert server.session_stats["evicted"] == 1
+    finally:
+        server.MAX_SESSIONS = original
+
+
+def test_history_cap():
+    """History keeps the newest MAX_MESSAGE_HISTORY messages; user_turns keeps counting."""
+    _reset_sessions()
+    original = server.MAX_MESSAGE_HISTORY
+    server.MAX_MESSAGE_HISTORY = 4
+    try:
+        session = server.get_or_create_session("cap")
+        for i in range(5):
+            server.append_turn(session, "user", f"q{i}")
+            server.append_turn(session, "assistant", f"a{i}")
+        assert [m.content for m in session["messages"]] == ["q3", "a3", "q4", "a4"]
+        assert session["user_turns"] == 5
+    finally:
+        server.MAX_MESSAGE_HISTORY = original
+
+
+def test_session_lock_serializes_turns():
+    """Turns on one session never overlap; turns on different sessions can."""
+    _reset_sessions()
+    agent = SlowAgent()
+    original_get_agent, original_enabled = server.get_agent, server.limiter.enabled
+    server.get_agent = lambda: agent
+    server.limiter.enabled = False
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            requests = [
+                client.post("/chat", json={"message": f"m{i}", "session_id": sid})
+                for sid in ("lock-a", "lock-b")
+                for i in range(3)
+            ]
+            return await asyncio.gather(*requests)
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        server.get_agent, server.limiter.enabled = original_get_agent, original_enabled
+
+    assert [r.status_code for r in responses] == [200] * 6
+    assert agent.max_active == {"lock-a": 1, "lock-b": 1}
+    assert agent.max_total == 2
+
+    # Each turn saw the previous one's history: user/assistant strictly alternate
+    roles = [type(m).__name__ for m in server.sessions["lock-a"]["messages"]]
+    assert roles == ["HumanMessage", "AIMessage"] * 3
+    assert server.sessions["lock-a"]["user_turns"] == 3
+